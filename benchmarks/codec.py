@@ -0,0 +1,70 @@
+"""Compare the codec layer against the stdlib json module.
+
+Run from the project root with ``python -m benchmarks.codec``.
+"""
+
+import json
+import timeit
+
+from obsidion.utils import codec
+
+# shaped like the hive game stats and server status payloads we cache
+PAYLOAD = {
+    "found": {
+        "stats": [
+            {
+                "UUID": "069a79f444e94726a5befca90e38aaf5",
+                "total_points": 123456,
+                "victories": 789,
+                "games_played": 4321,
+                "kills": 9876,
+                "deaths": 5432,
+                "title": "Veteran",
+                "achievements": {f"ACH_{i}": {"progress": i} for i in range(50)},
+            }
+        ],
+        "players": {
+            "online": 1234,
+            "max": 5000,
+            "sample": [{"name": f"player{i}", "id": "0" * 32} for i in range(12)],
+        },
+        "description": "A Minecraft Server " * 10,
+    },
+    "fresh_until": 1609459200.0,
+}
+
+NUMBER = 20000
+
+
+def bench(name: str, encode, decode) -> None:
+    data = encode(PAYLOAD)
+    encode_time = timeit.timeit(lambda: encode(PAYLOAD), number=NUMBER)
+    decode_time = timeit.timeit(lambda: decode(data), number=NUMBER)
+    print(
+        f"{name:<24} {len(data):>7} bytes"
+        f" {encode_time / NUMBER * 1e6:>8.2f}us encode"
+        f" {decode_time / NUMBER * 1e6:>8.2f}us decode"
+    )
+
+
+def main() -> None:
+    bench("stdlib json", lambda o: json.dumps(o).encode("utf-8"), json.loads)
+    bench(
+        f"codec json ({'orjson' if codec.orjson else 'stdlib'})",
+        codec.dumps,
+        codec.loads,
+    )
+    bench("cache codec", codec.Codec().encode, codec.Codec.decode)
+    if codec.msgpack is not None:
+        bench(
+            "cache codec msgpack", codec.Codec(binary=True).encode, codec.Codec.decode
+        )
+    bench(
+        "cache codec compressed",
+        codec.Codec(compress_threshold=0).encode,
+        codec.Codec.decode,
+    )
+
+
+if __name__ == "__main__":
+    main()
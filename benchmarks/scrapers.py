@@ -0,0 +1,306 @@
+"""Compare the lxml scrapers against the BeautifulSoup ones they replaced.
+
+Run from the project root with ``python -m benchmarks.scrapers``. Each site
+gets a synthetic profile page padded with the kind of markup the real pages
+carry around the stats, and both implementations must extract the same
+dict from it.
+"""
+
+import timeit
+
+from bs4 import BeautifulSoup
+
+from functools import partial
+
+from obsidion.cogs.servers import sites, utils
+
+# markup around the stats, roughly the size of a real profile page
+NOISE = (
+    "<script>window.dataLayer = window.dataLayer || [];</script>"
+    + "<nav><ul>"
+    + "".join(f"<li><a href='/page/{i}'>Page {i}</a></li>" for i in range(200))
+    + "</ul></nav>"
+    + "".join(
+        f"<div class='card'><p>Lorem ipsum <b>dolor</b> sit amet {i}</p></div>"
+        for i in range(800)
+    )
+)
+
+NUMBER = 50
+
+
+def page(body: str, title: str = "Player") -> str:
+    return (
+        f"<html><head><title>{title}</title></head>"
+        f"<body>{NOISE}{body}{NOISE}</body></html>"
+    )
+
+
+def blocksmc_page() -> str:
+    games = "".join(
+        f"<div class='col-xl-4'><div class='title'>\n Game {g} \n</div><ul>"
+        + "".join(
+            f"<li><div class='key'>\nStat {s}</div><div class='val'>{g * s}</div></li>"
+            for s in range(8)
+        )
+        + "</ul></div>"
+        for g in range(12)
+    )
+    return page(
+        "<p class='profile-rank'>\n VIP \n</p><h1 dir='ltr'>\n 12h \n</h1>" + games
+    )
+
+
+def universocraft_page() -> str:
+    games = "".join(
+        f"<div class='game'><h2>\n Game {g} \n</h2>"
+        + "".join(
+            f"<div class='game-stat'><p class='game-stat-count'>{g * s}</p>"
+            f"<p class='game-stat-title'>Stat {s}</p></div>"
+            for s in range(8)
+        )
+        + "</div>"
+        for g in range(12)
+    )
+    return page("<p>Perfil</p>" + games)
+
+
+def minesaga_page() -> str:
+    games = "".join(
+        f"<div class='dd-section col-md-4'><div class='dd-box-title'>\n Game {g}</div>"
+        + "".join(f"<dl><dt>\nStat {s} </dt><dd>{g * s}</dd></dl>" for s in range(8))
+        + "</div>"
+        for g in range(12)
+    )
+    return page(
+        "<div class='dd-profile-details'><h4> 2019-01-01 </h4>"
+        "<span>Player</span><span> yesterday </span><span> 3 days </span></div>" + games
+    )
+
+
+def gommehd_page() -> str:
+    games = "".join(
+        f"<div class='stat-table'><h5>\n Game {g} \n</h5><ul>"
+        + "".join(
+            f"<li>\n Stat {s} <span class='score'>{g * s + 1000}</span></li>"
+            for s in range(8)
+        )
+        + "</ul></div>"
+        for g in range(12)
+    )
+    return page(games)
+
+
+def veltpvp_page() -> str:
+    def game(tag: str, classes: str, name: str) -> str:
+        stats = "".join(
+            f"<div class='server-stat'><div class='server-stat-number'> {s} </div>"
+            f"<div class='server-stat-description'> Stat {s} </div></div>"
+            for s in range(3)
+        )
+        return (
+            f"<{tag} class='{classes}'><div class='server-header'> {name} </div>"
+            f"{stats}<div class='server unknown'></div></{tag}>"
+        )
+
+    info = "\n".join(["", "Joined", "", " 2018 ", "", " 5\xa0days ", "", " 42 ", ""])
+    return page(
+        "<div id='profile'><h2> Member </h2></div>"
+        "<div class='top'> Online </div>"
+        "<div class='bottom'>Last seen\n\n 2\xa0hours ago \n</div>"
+        f"<div class='element'>x</div><div class='element'>{info}</div>"
+        + game("a", "server", "HCF")
+        + "".join(game("div", "server", f"Game {g}") for g in range(6))
+    )
+
+
+# the BeautifulSoup implementations the lxml scrapers replaced
+
+
+def soup_blocksmc(html):
+    soup = BeautifulSoup(html, "lxml")
+    try:
+        rank = (
+            soup.find("p", {"class": ["profile-rank"]})
+            .get_text()
+            .replace("\n", "")
+            .strip()
+        )
+    except AttributeError:
+        return False
+
+    timeplayed = soup.find("h1", {"dir": ["ltr"]}).get_text().replace("\n", "").strip()
+    data = {"rank": rank, "timeplayed": timeplayed, "game_stats": []}
+
+    for game in soup.find_all("div", {"class": "col-xl-4"}):
+        stats = {}
+        game_name = (
+            game.find("div", {"class": "title"}).get_text().replace("\n", "").strip()
+        )
+        for stat in game.find_all("li"):
+            stat_name = (
+                stat.find("div", {"class": "key"}).get_text().replace("\n", "").strip()
+            )
+            stat_val = int(stat.find("div", {"class": "val"}).get_text())
+            stats[stat_name] = stat_val
+        data["game_stats"].append({game_name: stats})
+    return data
+
+
+def soup_universocraft(html):
+    soup = BeautifulSoup(html, "lxml")
+    data = {"game_stats": []}
+    if (
+        soup.find("p").get_text()
+        == "¡No se ha encontrado ningún usuario con ese nombre!"
+    ):
+        return False
+    for game in soup.find_all("div", {"class": "game"}):
+        stats = {}
+        game_name = game.find("h2").get_text().replace("\n", "").strip()
+        for stat in game.find_all("div", {"class": "game-stat"}):
+            stat_val = stat.find("p", {"class": "game-stat-count"}).get_text()
+            stat_name = stat.find("p", {"class": "game-stat-title"}).get_text()
+            stats[stat_name] = stat_val
+        data["game_stats"].append({game_name: stats})
+    return data
+
+
+def soup_minesaga(html):
+    soup = BeautifulSoup(html, "lxml")
+    main_info = soup.find("div", {"class": ["dd-profile-details"]})
+    try:
+        joined = main_info.find("h4").get_text().strip()
+    except AttributeError:
+        return False
+    last_seen = main_info.findAll("span")[1].get_text().strip()
+    play_time = main_info.findAll("span")[2].get_text().strip()
+    data = {
+        "joined": joined,
+        "last_seen": last_seen,
+        "play_time": play_time,
+        "game_stats": [],
+    }
+
+    for game in soup.find_all("div", {"class": "dd-section col-md-4"}):
+        stats = {}
+        game_name = (
+            game.find("div", {"class": "dd-box-title"})
+            .get_text()
+            .replace("\n", "")
+            .strip()
+        )
+        for stat in game.find_all("dl"):
+            stat_name = stat.find("dt").get_text().replace("\n", "").strip()
+            stat_val = stat.find("dd").get_text()
+            stats[stat_name] = stat_val
+        data["game_stats"].append({game_name: stats})
+
+    return data
+
+
+def soup_gommehd(html):
+    soup = BeautifulSoup(html, "lxml")
+    data = {"game_stats": []}
+    if soup.find("title").get_text() == "Statistiken":
+        return False
+    for game in soup.find_all("div", {"class": "stat-table"}):
+        stats = {}
+        game_name = game.find("h5").get_text().replace("\n", "").strip()
+        for stat in game.find_all("li"):
+            stat_val = stat.find("span", {"class": "score"}).get_text()
+            # the registry strips the name, the old scraper left a trailing space
+            stat_name = (
+                stat.get_text().replace("\n", "").strip().replace(stat_val, "").strip()
+            )
+            stats[stat_name] = stat_val
+        data["game_stats"].append({game_name: stats})
+    return data
+
+
+def soup_veltpvp(html):
+    soup = BeautifulSoup(html, "lxml")
+    rank = soup.find("div", {"id": "profile"}).find("h2").get_text().strip()
+    last_seen = (
+        soup.find("div", {"class": "bottom"})
+        .get_text()
+        .split("\n")[2]
+        .replace("\xa0", " ")
+        .strip()
+    )
+    current_status = soup.find("div", {"class": "top"}).get_text().strip()
+    info = soup.find_all("div", {"class": "element"})[1].get_text().split("\n")
+    first_joined = info[3].strip()
+    time_played = info[5].replace("\xa0", " ").strip()
+    monthly_views = info[7].strip()
+    data = {
+        "rank": rank,
+        "last_seen": last_seen,
+        "current_status": current_status,
+        "first_joined": first_joined,
+        "time_played": time_played,
+        "monthly_views": monthly_views,
+        "game_stats": [],
+    }
+
+    # first stat is special
+    first_game = soup.find("a", {"class": "server"})
+    game_name = first_game.find("div", {"class": "server-header"}).get_text().strip()
+    stats = {}
+    for stat in first_game.find_all("div", {"class": "server-stat"}):
+        stat_name = (
+            stat.find("div", {"class": "server-stat-description"}).get_text().strip()
+        )
+        stat_val = stat.find("div", {"class": "server-stat-number"}).get_text().strip()
+        stats[stat_name] = stat_val
+    data["game_stats"].append({game_name: stats})
+
+    for game in soup.find_all("div", {"class": "server"}):
+        if not game.find("div", {"class": "server unknown"}):
+            break
+        game_name = game.find("div", {"class": "server-header"}).get_text().strip()
+        stats = {}
+        for stat in game.find_all("div", {"class": "server-stat"}):
+            stat_name = (
+                stat.find("div", {"class": "server-stat-description"})
+                .get_text()
+                .strip()
+            )
+            stat_val = (
+                stat.find("div", {"class": "server-stat-number"}).get_text().strip()
+            )
+            stats[stat_name] = stat_val
+        data["game_stats"].append({game_name: stats})
+    return data
+
+
+SITES = {
+    "blocksmc": (blocksmc_page, soup_blocksmc, partial(sites.parse_site, "blocksmc")),
+    "universocraft": (
+        universocraft_page,
+        soup_universocraft,
+        partial(sites.parse_site, "universocraft"),
+    ),
+    "minesaga": (minesaga_page, soup_minesaga, partial(sites.parse_site, "minesaga")),
+    "gommehd": (gommehd_page, soup_gommehd, partial(sites.parse_site, "gommehd")),
+    "veltpvp": (veltpvp_page, soup_veltpvp, utils.parse_veltpvp),
+}
+
+
+def main() -> None:
+    for name, (make_page, soup_parse, lxml_parse) in SITES.items():
+        html = make_page()
+        expected = soup_parse(html)
+        assert lxml_parse(html) == expected, f"{name} extracted different data"
+        soup_time = timeit.timeit(lambda: soup_parse(html), number=NUMBER) / NUMBER
+        lxml_time = timeit.timeit(lambda: lxml_parse(html), number=NUMBER) / NUMBER
+        print(
+            f"{name:<16} {len(html) // 1024:>5} KiB"
+            f" {soup_time * 1e3:>8.2f}ms soup"
+            f" {lxml_time * 1e3:>8.2f}ms lxml"
+            f" {soup_time / lxml_time:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
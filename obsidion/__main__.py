@@ -25,6 +25,8 @@ activity = discord.Activity(
 intents = discord.Intents.none()
 intents.messages = True
 intents.guilds = True
+# lets the author page through multi player replies
+intents.reactions = True
 
 mentions = discord.AllowedMentions(
     everyone=False,
@@ -4,17 +4,25 @@ import logging
 import socket
 import sys
 from enum import IntEnum
-from typing import Optional
+from typing import Optional, Union
 
 import aiohttp
 import aioredis
 import discord
-import fakeredis.aioredis
 from discord.ext import commands
 import asyncpg
 
 from obsidion import constants
 from obsidion.core.global_checks import init_global_checks
+from obsidion.utils.breaker import breakers
+from obsidion.utils.cache import Cache
+from obsidion.utils.http import create_connector, create_session
+from obsidion.utils.http_cache import HttpCache
+from obsidion.utils.identity import IdentityStore
+from obsidion.utils.memory_redis import MemoryRedis
+from obsidion.utils.mojang import MojangClient, UsernameResolver
+from obsidion.utils.parsing import parsing_pool
+from obsidion.utils.sqlite_redis import SqliteRedis
 
 log = logging.getLogger(__name__)
 
@@ -27,13 +35,23 @@ class Obsidion(commands.AutoShardedBot):
         super().__init__(*args, **kwargs)
 
         self.http_session: Optional[aiohttp.ClientSession] = None
-        self.redis_session: Optional[aioredis.Redis] = None
+        self.redis_session: Optional[
+            Union[aioredis.Redis, MemoryRedis, SqliteRedis]
+        ] = None
         self.redis_ready = asyncio.Event()
         self.redis_closed = False
+        self.cache = Cache(self)
+        self.http_cache = HttpCache(self)
+        self.mojang = MojangClient(self)
+        self.username_resolver = UsernameResolver(self)
         self.db_pool = None
         self.db_ready = asyncio.Event()
+        self.identities = IdentityStore(self)
+        if constants.Stats.enabled:
+            breakers.listener = self._report_breaker
 
         self._connector = None
+        self._http_connector = None
         self._resolver = None
 
         self.uptime = None
@@ -41,9 +59,13 @@ class Obsidion(commands.AutoShardedBot):
         # Do basic checks on every command
         init_global_checks(self)
 
+    def _report_breaker(self, host: str, event: str) -> None:
+        """Forward circuit breaker state changes and rejections to statsd."""
+        self.stats.incr(f"breakers.{host.replace('.', '_')}.{event}")
+
     async def _create_db_pool(self) -> None:
         """
-        Create the postgres connection pool.
+        Create the postgres connection pool and the tables the bot uses.
         """
         self.db_pool = await asyncpg.create_pool(
             database=constants.Database.database,
@@ -52,24 +74,32 @@ class Obsidion(commands.AutoShardedBot):
             host=constants.Database.host,
             port=constants.Database.port,
         )
+        await self.identities.create_schema()
 
         self.db_ready.set()
 
     async def _create_redis_session(self) -> None:
         """
         Create the Redis connection pool, and then open the redis event gate.
-        If constants.Redis.use_fakeredis is True, we'll set up a fake redis pool instead
+        If constants.Redis.enabled is False, we'll use a local store instead
         of attempting to communicate with a real Redis server. This is useful because it
-        means contributors don't necessarily need to get Redis running locally just
-        to run the bot.
-        The fakeredis cache won't have persistence across restarts, but that
-        usually won't matter for local bot testing.
+        means contributors and small deployments don't necessarily need to get Redis
+        running just to run the bot.
+        The `memory` store is bounded by constants.Redis.max_memory and won't have
+        persistence across restarts, the `sqlite` store keeps the cache warm across
+        restarts in constants.Redis.sqlite_path.
         """
-        if not constants.Redis.enabled:
+        if not constants.Redis.enabled and constants.Redis.local_store == "sqlite":
+            log.info(
+                f"Using a sqlite store at {constants.Redis.sqlite_path} instead of "
+                "communicating with a real Redis server."
+            )
+            self.redis_session = await SqliteRedis.create(constants.Redis.sqlite_path)
+        elif not constants.Redis.enabled:
             log.info(
-                "Using fakeredis instead of communicating with a real Redis server."
+                "Using an in-process store instead of communicating with a real Redis server."
             )
-            self.redis_session = await fakeredis.aioredis.create_redis_pool()
+            self.redis_session = MemoryRedis(constants.Redis.max_memory)
         else:
             self.redis_session = await aioredis.create_redis_pool(
                 address=(constants.Redis.host, constants.Redis.port),
@@ -95,9 +125,14 @@ class Obsidion(commands.AutoShardedBot):
         if self._connector:
             await self._connector.close()
 
+        if self._http_connector:
+            await self._http_connector.close()
+
         if self._resolver:
             await self._resolver.close()
 
+        parsing_pool.shutdown()
+
         if self.stats._transport:
             self.stats._transport.close()
 
@@ -147,7 +182,10 @@ class Obsidion(commands.AutoShardedBot):
                 "The previous session was not closed; it will remain open and be overwritten"
             )
 
-        self.http_session = aiohttp.ClientSession(connector=self._connector)
+        # Upstream apis get their own connector so a slow one can't hold up
+        # connections to Discord.
+        self._http_connector = create_connector(self._resolver)
+        self.http_session = create_session(self._http_connector)
 
     async def get_context(self, message, *, cls=commands.Context):
         return await super().get_context(message, cls=cls)
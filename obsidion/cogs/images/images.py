@@ -1,10 +1,15 @@
+import asyncio
+from typing import Tuple
+
 import discord
 from discord.ext import commands
 
-from obsidion.utils.utils import usernameToUUID
-
 import logging
 
+from obsidion.utils.chat_formatting import humanize_list
+from obsidion.utils.converters import MinecraftPlayer, Player, unique_players
+from obsidion.utils.pagination import paginate
+
 log = logging.getLogger(__name__)
 
 
@@ -45,67 +50,83 @@ class images(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-    @commands.command()
-    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def avatar(self, ctx: commands.Context, username: str):
-        """Renders a Minecraft players face."""
-        await ctx.channel.trigger_typing()
-        uuid = await usernameToUUID(username, ctx.bot.http_session)
-        if uuid:
+    async def send_renders(
+        self,
+        ctx: commands.Context,
+        players: Tuple[Player, ...],
+        render_type: str,
+        label: str,
+    ):
+        """Send a render of each player, one page per player."""
+        players = unique_players(players)
+        uuids = await asyncio.gather(*(player.uuid() for player in players))
+        pages = []
+        missing = []
+        for player, uuid in zip(players, uuids):
+            if not uuid:
+                missing.append(f"`{player}`")
+                continue
             embed = discord.Embed(
-                description=f"Here is: `{username}`'s Face! \n **[DOWNLOAD](https://visage.surgeplay.com/face/512/{uuid})**",
+                description=f"Here is: `{player}`'s {label}! \n **[DOWNLOAD](https://visage.surgeplay.com/{render_type}/512/{uuid})**",
                 color=0x00FF00,
             )
-            embed.set_image(url=f"https://visage.surgeplay.com/face/512/{uuid}")
-
-            await ctx.send(embed=embed)
-        else:
+            embed.set_image(
+                url=f"https://visage.surgeplay.com/{render_type}/512/{uuid}"
+            )
+            pages.append(embed)
+        if missing:
             await ctx.send(
-                f"{ctx.message.author.mention}, :x: The user: `{username}` does not exist!"
+                f"{ctx.message.author.mention}, :x: The user: {humanize_list(missing)} does not exist!"
             )
+        if pages:
+            await paginate(ctx, pages)
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def skull(self, ctx: commands.Context, username: str = None):
-        """Renders a Minecraft players skull."""
+    async def avatar(
+        self,
+        ctx: commands.Context,
+        username: MinecraftPlayer,
+        *usernames: MinecraftPlayer,
+    ):
+        """Renders Minecraft players faces."""
         await ctx.channel.trigger_typing()
-        uuid = await usernameToUUID(username, ctx.bot.http_session)
-        if uuid:
-            embed = discord.Embed(
-                description=f"Here is: `{username}`'s Skull! \n **[DOWNLOAD](https://visage.surgeplay.com/head/512/{uuid})**",
-                color=0x00FF00,
-            )
-            embed.set_image(url=f"https://visage.surgeplay.com/head/512/{uuid}")
-
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(
-                f"{ctx.message.author.mention}, :x: The user: `{username}` does not exist!"
-            )
+        await self.send_renders(ctx, (username, *usernames), "face", "Face")
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def skin(self, ctx: commands.Context, username: str):
-        """Renders a Minecraft players skin."""
+    async def skull(
+        self,
+        ctx: commands.Context,
+        username: MinecraftPlayer,
+        *usernames: MinecraftPlayer,
+    ):
+        """Renders Minecraft players skulls."""
         await ctx.channel.trigger_typing()
-        uuid = await usernameToUUID(username, ctx.bot.http_session)
-        if uuid:
-            embed = discord.Embed(
-                description=f"Here is: `{username}`'s Skin! \n **[DOWNLOAD](https://visage.surgeplay.com/full/512/{uuid})**",
-                color=0x00FF00,
-            )
-            embed.set_image(url=f"https://visage.surgeplay.com/full/512/{uuid}")
+        await self.send_renders(ctx, (username, *usernames), "head", "Skull")
 
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(
-                f"{ctx.message.author.mention}, :x: The user: `{username}` does not exist!"
-            )
+    @commands.command()
+    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
+    async def skin(
+        self,
+        ctx: commands.Context,
+        username: MinecraftPlayer,
+        *usernames: MinecraftPlayer,
+    ):
+        """Renders Minecraft players skins."""
+        await ctx.channel.trigger_typing()
+        await self.send_renders(ctx, (username, *usernames), "full", "Skin")
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def render(self, ctx: commands.Context, render_type: str, username: str):
-        """Renders a Minecraft players skin in 6 different ways. You can choose from these 6 render types: face, front, frontfull, head, bust & skin."""
+    async def render(
+        self,
+        ctx: commands.Context,
+        render_type: str,
+        username: MinecraftPlayer,
+        *usernames: MinecraftPlayer,
+    ):
+        """Renders Minecraft players skins in 6 different ways. You can choose from these 6 render types: face, front, frontfull, head, bust & skin."""
         await ctx.channel.trigger_typing()
         renders = ["face", "front", "frontfull", "head", "bust", "skin"]
         if render_type not in renders:
@@ -113,18 +134,4 @@ class images(commands.Cog):
                 f"{ctx.message.author.mention}, Please supply a render type. Your options are:\n `face`, `front`, `frontfull`, `head`, `bust`, `skin` \n Type: ?render <render type> <username>"
             )
             return
-        uuid = await usernameToUUID(username, ctx.bot.http_session)
-        if uuid:
-            embed = discord.Embed(
-                description=f"Here is: `{username}`'s {render_type}! \n **[DOWNLOAD](https://visage.surgeplay.com/{render_type}/512/{uuid})**",
-                color=0x00FF00,
-            )
-            embed.set_image(
-                url=f"https://visage.surgeplay.com/{render_type}/512/{uuid}"
-            )
-
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(
-                f"{ctx.message.author.mention}, :x: The user: `{username}` does not exist!"
-            )
+        await self.send_renders(ctx, (username, *usernames), render_type, render_type)
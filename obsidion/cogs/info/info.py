@@ -1,15 +1,23 @@
+import asyncio
 import base64
 import io
-import json
 import logging
 from datetime import datetime
+from typing import Optional
 
+import aiodns
 import discord
 from discord.ext import commands
 
 from obsidion import constants
 from obsidion.bot import Obsidion
-from obsidion.utils.utils import get
+from obsidion.utils.chat_formatting import humanize_list
+from obsidion.utils.converters import MinecraftPlayer, Player, unique_players
+from obsidion.utils.pagination import paginate
+from obsidion.utils.retry import policy_for
+from obsidion.utils.utils import UpstreamError, get
+
+from .utils import SERVER_NAMESPACE, canonical_address
 
 log = logging.getLogger(__name__)
 
@@ -20,46 +28,29 @@ class info(commands.Cog):
     def __init__(self, bot: Obsidion):
         """initialise the bot"""
         self.bot = bot
+        self._resolver = None
 
-    @staticmethod
-    async def get_uuid(session, username: str):
-        url = f"https://api.mojang.com/users/profiles/minecraft/{username}"
-        async with session.get(url) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                uuid = data["id"]
-                return uuid
-            return False
+    async def get_names(self, uuid: str):
+        """Get the name history of a player, preferring the identity index."""
+        names = await self.bot.identities.names_for(uuid)
+        if names:
+            return names
+        names = await self.bot.mojang.name_history(uuid)
+        await self.bot.identities.store_names(uuid, names)
+        return names
 
-    @commands.command(
-        aliases=["whois", "p", "names", "namehistory", "pastnames", "namehis"]
-    )
-    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def profile(self, ctx: commands.Context, username: str):
-        """View a players Minecraft UUID, Username history and skin."""
-        await ctx.channel.trigger_typing()
-        if await self.bot.redis_session.exists(f"username_{username}"):
-            uuid = await self.bot.redis_session.get(
-                f"username_{username}", encoding="utf-8"
-            )
-        else:
-            uuid = await self.get_uuid(ctx.bot.http_session, username)
-            self.bot.redis_session.set(f"username_{username}", uuid, expire=28800)
+    async def profile_embed(self, player: Player) -> Optional[discord.Embed]:
+        """Build the profile of a player, or None if the username is not used."""
+        uuid = await player.uuid()
 
         if not uuid:
-            await ctx.send("That username is not been used.")
-            return
+            return None
 
         long_uuid = f"{uuid[0:8]}-{uuid[8:12]}-{uuid[12:16]}-{uuid[16:20]}-{uuid[20:]}"
 
-        if await self.bot.redis_session.exists(uuid):
-            names = json.loads(await self.bot.redis_session.get(uuid))
-        else:
-            names = await get(
-                ctx.bot.http_session,
-                f"https://api.mojang.com/user/profiles/{uuid}/names",
-            )
-            self.bot.redis_session.set(uuid, json.dumps(names), expire=28800)
+        names = await self.bot.cache.get_or_fetch(
+            "names", uuid, lambda: self.get_names(uuid), expire=28800
+        )
 
         name_list = ""
         for name in names[::-1][:-1]:
@@ -75,7 +66,7 @@ class info(commands.Cog):
         information = ""
         information += f"Username Changes: `{len(names)-1}`\n"
 
-        embed = discord.Embed(title=f"Minecraft profile for {username}", color=0x00FF00)
+        embed = discord.Embed(title=f"Minecraft profile for {player}", color=0x00FF00)
 
         embed.add_field(name="UUID's", inline=False, value=uuids)
         embed.add_field(
@@ -87,41 +78,85 @@ class info(commands.Cog):
         embed.add_field(name="Name History", inline=False, value=name_list)
         embed.set_thumbnail(url=(f"https://visage.surgeplay.com/bust/{uuid}"))
 
-        await ctx.send(embed=embed)
+        return embed
+
+    @commands.command(
+        aliases=["whois", "p", "names", "namehistory", "pastnames", "namehis"]
+    )
+    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
+    async def profile(
+        self,
+        ctx: commands.Context,
+        username: MinecraftPlayer,
+        *usernames: MinecraftPlayer,
+    ):
+        """View players Minecraft UUID, Username history and skin."""
+        await ctx.channel.trigger_typing()
+        players = unique_players((username, *usernames))
+        results = await asyncio.gather(
+            *(self.profile_embed(player) for player in players),
+            return_exceptions=True,
+        )
 
-    @staticmethod
-    def get_server(ip: str, port):
-        """returns the server icon"""
-        if ":" in ip:  # deal with them providing port in string instead of seperate
-            ip, port = ip.split(":")
-            return (ip, port)
-        if port:
-            return (ip, port)
-        return (ip, None)
+        pages, unused, failed, error = [], [], [], None
+        for player, result in zip(players, results):
+            if isinstance(result, UpstreamError):
+                failed.append(f"`{player}`")
+                error = result
+            elif isinstance(result, BaseException):
+                raise result
+            elif result is None:
+                unused.append(f"`{player}`")
+            else:
+                pages.append(result)
+        if len(failed) == len(players):
+            # nothing to show, let the error handler say the service is down
+            raise error
+
+        if len(unused) == len(players) == 1:
+            await ctx.send("That username is not been used.")
+        elif unused:
+            await ctx.send(
+                f"These usernames have not been used: {humanize_list(unused)}"
+            )
+        if failed:
+            await ctx.send(
+                f"These players could not be looked up right now: {humanize_list(failed)}"
+            )
+
+        if pages:
+            await paginate(ctx, pages)
+
+    @property
+    def resolver(self) -> aiodns.DNSResolver:
+        """DNS resolver used for SRV lookups, created on first use."""
+        if self._resolver is None:
+            self._resolver = aiodns.DNSResolver()
+        return self._resolver
+
+    async def get_server(self, server_ip: str, port: Optional[int], edition: str):
+        """Resolve a server and get its status from the api."""
+        address = await canonical_address(
+            self.bot.cache, self.resolver, server_ip, port, edition
+        )
+        url = f"{constants.Bot.api}/server/{edition}"
+        payload = {"server": address.host, "port": address.port}
+        return await self.bot.cache.get_or_fetch(
+            SERVER_NAMESPACE,
+            f"{edition}:{address.key}",
+            lambda: policy_for("server_status").call(
+                lambda: get(self.bot.http_session, url, payload)
+            ),
+            expire=300,
+            stale=900,
+        )
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
     async def server(self, ctx: commands.Context, server_ip: str, port: int = None):
         """Get info on a minecraft server"""
         await ctx.channel.trigger_typing()
-        url = f"{constants.Bot.api}/server/java"
-        server_ip, _port = self.get_server(server_ip, port)
-        if _port:
-            port = _port
-        if port:
-            payload = {"server": server_ip, "port": port}
-        else:
-            payload = {"server": server_ip}
-
-        if port:
-            key = f"server_{server_ip}:ip"
-        else:
-            key = f"server_{server_ip}"
-        if await self.bot.redis_session.exists(key):
-            data = json.loads(await self.bot.redis_session.get(key))
-        else:
-            data = await get(ctx.bot.http_session, url, payload)
-            self.bot.redis_session.set(key, json.dumps(data), expire=300)
+        data = await self.get_server(server_ip, port, "java")
         if not data:
             await ctx.send(
                 f"{ctx.author}, :x: The Java edition Minecraft server `{server_ip}` is currently not online or cannot be requested"
@@ -161,24 +196,7 @@ class info(commands.Cog):
     async def serverpe(self, ctx: commands.Context, server_ip: str, port: int = None):
         """Get info on a minecraft PE server"""
         await ctx.channel.trigger_typing()
-        url = f"{constants.Bot.api}/server/bedrock"
-        server_ip, _port = self.get_server(server_ip, port)
-        if _port:
-            port = _port
-        if port:
-            payload = {"server": server_ip, "port": port}
-        else:
-            payload = {"server": server_ip}
-
-        if port:
-            key = f"bserver_{server_ip}:ip"
-        else:
-            key = f"bserver_{server_ip}"
-        if await self.bot.redis_session.exists(key):
-            data = json.loads(await self.bot.redis_session.get(key))
-        else:
-            data = await get(ctx.bot.http_session, url, payload)
-            self.bot.redis_session.set(key, json.dumps(data), expire=300)
+        data = await self.get_server(server_ip, port, "bedrock")
         if not data:
             await ctx.send(
                 f"{ctx.author}, :x: The Bedrock edition Minecraft server `{server_ip}` is currently not online or cannot be requested"
@@ -215,16 +233,15 @@ class info(commands.Cog):
             "item_sold_cobalt": False,
             "item_sold_scrolls": False,
         }
-        payload = {"metricKeys": [k for (k, v) in sales_mapping.items() if v]}
-
-        if await self.bot.redis_session.exists("status"):
-            sales_data = json.loads(await self.bot.redis_session.get("status"))
-        else:
-            url = "https://api.mojang.com/orders/statistics"
-            async with ctx.bot.http_session.post(url, json=payload) as resp:
-                if resp.status == 200:
-                    sales_data = await resp.json()
-            await self.bot.redis_session.set("status", json.dumps(sales_data))
+        metric_keys = [k for (k, v) in sales_mapping.items() if v]
+
+        sales_data = await self.bot.cache.get_or_fetch(
+            "status",
+            "sales",
+            lambda: self.bot.mojang.sales(metric_keys),
+            expire=300,
+            stale=3600,
+        )
 
         services = ""
         for service in data:
@@ -235,10 +252,11 @@ class info(commands.Cog):
             else:
                 services += f":heart: - {service}: **This service is offline.** \n"
         embed = discord.Embed(title="Minecraft Service Status", color=0x00FF00)
-        embed.add_field(
-            name="Minecraft Game Sales",
-            value=f"Total Sales: **{sales_data['total']:,}** Last 24 Hours: **{sales_data['last24h']:,}**",
-        )
+        if sales_data:
+            embed.add_field(
+                name="Minecraft Game Sales",
+                value=f"Total Sales: **{sales_data['total']:,}** Last 24 Hours: **{sales_data['last24h']:,}**",
+            )
         embed.add_field(name="Minecraft Services:", value=services, inline=False)
 
         await ctx.send(embed=embed)
@@ -251,8 +269,8 @@ class info(commands.Cog):
             await ctx.send(f"{ctx.message.author.mention},  :x: Please provide a bug.")
             return
         await ctx.channel.trigger_typing()
-        data = await get(
-            ctx.bot.http_session, f"https://bugs.mojang.com/rest/api/latest/issue/{bug}"
+        data = await self.bot.http_cache.get(
+            f"https://bugs.mojang.com/rest/api/latest/issue/{bug}"
         )
         if not data:
             await ctx.send(
@@ -322,7 +340,7 @@ class info(commands.Cog):
 
         payload = generate_payload(query)
 
-        result = await get(ctx.bot.http_session, base_url, payload)
+        result = await self.bot.http_cache.get(base_url, payload)
 
         try:
             # Get the last page. Usually this is the only page.
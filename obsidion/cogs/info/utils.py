@@ -0,0 +1,104 @@
+import ipaddress
+from typing import NamedTuple, Optional
+
+import aiodns
+from discord.ext import commands
+
+# bump the version when the shape of cached server data changes
+SERVER_NAMESPACE = "server_v2"
+
+DEFAULT_PORTS = {"java": 25565, "bedrock": 19132}
+
+
+class ServerAddress(NamedTuple):
+    host: str
+    port: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_address(address: str, port: Optional[int]) -> ServerAddress:
+    """Normalise a user supplied server address.
+
+    The host is lowercased and stripped of a trailing dot, and a port given in
+    the address takes precedence over the separate argument.
+
+    Args:
+        address (str): host, optionally followed by `:port`
+        port (Optional[int]): port given separately
+
+    Raises:
+        commands.BadArgument: the port is not a valid port number
+
+    Returns:
+        ServerAddress: host and port, the port being None if not given
+    """
+    host = address.strip().lower()
+    if host.count(":") == 1:  # deal with them providing port in string
+        host, _port = host.split(":")
+        try:
+            port = int(_port)
+        except ValueError:
+            raise commands.BadArgument(f"`{_port}` is not a valid port.")
+    host = host.rstrip(".")
+    if port is not None and not 0 < port < 65536:
+        raise commands.BadArgument(f"`{port}` is not a valid port.")
+    return ServerAddress(host, port)
+
+
+async def lookup_srv(resolver: aiodns.DNSResolver, host: str) -> Optional[list]:
+    """Find the target of a Java server's SRV record.
+
+    Args:
+        resolver (aiodns.DNSResolver): resolver to query with
+        host (str): host the user gave
+
+    Returns:
+        Optional[list]: host and port of the target, or None without a record
+    """
+    try:
+        records = await resolver.query(f"_minecraft._tcp.{host}", "SRV")
+    except aiodns.error.DNSError:
+        return None
+    if not records:
+        return None
+    record = min(records, key=lambda r: (r.priority, -r.weight))
+    return [record.host.lower().rstrip("."), record.port]
+
+
+async def canonical_address(
+    cache, resolver: aiodns.DNSResolver, address: str, port: Optional[int], edition: str
+) -> ServerAddress:
+    """Resolve a user supplied address to the host and port that will be pinged.
+
+    Java addresses without an explicit port follow their SRV record the same
+    way the game does, so every spelling of a server shares one cache entry.
+
+    Args:
+        cache (Cache): the bot's cache, used for SRV lookups
+        resolver (aiodns.DNSResolver): resolver to query with
+        address (str): host, optionally followed by `:port`
+        port (Optional[int]): port given separately
+        edition (str): `java` or `bedrock`
+
+    Returns:
+        ServerAddress: canonical host and port
+    """
+    host, port = parse_address(address, port)
+    if port is None and edition == "java" and not _is_ip(host):
+        target = await cache.get_or_fetch(
+            "srv", host, lambda: lookup_srv(resolver, host), expire=3600
+        )
+        if target:
+            return ServerAddress(*target)
+    return ServerAddress(host, port or DEFAULT_PORTS[edition])
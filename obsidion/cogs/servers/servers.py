@@ -1,19 +1,24 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
 import discord
 from discord.ext import commands
 from .utils import (
     wyncraftClasses,
+    hiveMCPlayer,
     hiveMCStatus,
     hiveMCGameStats,
     hiveMCRank,
     manacube,
-    blocksmc,
-    universocraft,
-    minesaga,
-    gommehd,
     veltpvp,
 )
-from obsidion.utils.utils import usernameToUUID
-import json
+from .sites import SITES, Site
+from obsidion import constants
+from obsidion.utils.chat_formatting import humanize_list
+from obsidion.utils.converters import MinecraftPlayer, Player
+from obsidion.utils.pagination import paginate
+from obsidion.utils.parsing import parsing_pool
+from obsidion.utils.utils import UpstreamError
 
 hive_con = {
     # "survival_games": "SG",
@@ -47,23 +52,108 @@ hive_con = {
     "explosive_eggs": "EE",
 }
 
+# games shown on each page of a hive overview
+GAMES_PER_PAGE = 3
+
+# stats hivestats leaves out, they're ids and timestamps rather than scores
+HIVE_HIDDEN = ("UUID", "cached", "firstLogin", "lastLogin", "achievements", "title")
+
+
+def hive_stats_value(stats: dict) -> str:
+    """Format a player's stats in a Hive game as a field value."""
+    value = ""
+    for stat, score in stats.items():
+        if stat in HIVE_HIDDEN or isinstance(score, (list, dict)):
+            continue
+        value += f"`{stat}`: {score}\n"
+    return value
+
+
+def hive_embed(ctx: commands.Context, username: Player, uuid: str) -> discord.Embed:
+    """Start an embed of a player's Hive stats."""
+    embed = discord.Embed(color=0xFFAF03)
+    embed.set_author(
+        name=f"Hive Stats for {username}",
+        url=f"https://www.hivemc.com/player/{username}",
+        icon_url="https://www.hivemc.com/img/white-logo.png",
+    )
+    embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
+    embed.timestamp = ctx.message.created_at
+    return embed
+
+
+def site_command(site: Site) -> commands.Command:
+    """Make the command that shows the stats of a player on a scraped site."""
+
+    async def command(self, ctx: commands.Context, username: MinecraftPlayer):
+        await ctx.trigger_typing()
+        data, uuid = await self.player_lookup(
+            username, site.name, site.fetch, expire=site.ttl
+        )
+        if not data:
+            await ctx.send(
+                f"`{username}` has not logged onto {site.title} or their status is not available."
+            )
+            return
+        embed = site.embed(username.name, uuid, data)
+        embed.timestamp = ctx.message.created_at
+        await ctx.send(embed=embed)
+
+    command.__doc__ = f"Get statistics of a player on {site.name}."
+    return commands.command(name=site.name)(
+        commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)(command)
+    )
+
 
 class servers(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        parsing_pool.warm()
+
+    async def player_lookup(
+        self,
+        player: Player,
+        namespace: str,
+        fetch: Callable[[str, Any], Awaitable[Any]],
+        *,
+        key: Optional[str] = None,
+        expire: int = 28800,
+    ) -> Tuple[Any, str]:
+        """Get a player's cached stats and uuid concurrently.
+
+        The uuid is only used for the bust image, so if it can't be resolved
+        the username is returned in its place.
+        """
+        data, uuid = await asyncio.gather(
+            self.bot.cache.get_or_fetch(
+                namespace,
+                key or player.key,
+                lambda: fetch(player.name, self.bot.http_session),
+                expire=expire,
+            ),
+            player.uuid(),
+            return_exceptions=True,
+        )
+        if isinstance(data, BaseException):
+            raise data
+        if isinstance(uuid, UpstreamError) or not uuid:
+            uuid = player.name
+        elif isinstance(uuid, BaseException):
+            raise uuid
+        return data, uuid
+
+    # networks scraped from their profile pages, declared in sites.py
+    blocksmc = site_command(SITES["blocksmc"])
+    universocraft = site_command(SITES["universocraft"])
+    minesaga = site_command(SITES["minesaga"])
+    gommehd = site_command(SITES["gommehd"])
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def wyncraft(self, ctx: commands.Context, username: str):
+    async def wyncraft(self, ctx: commands.Context, username: MinecraftPlayer):
         """Get statistics of a player on wynncraft."""
         await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"wyncraft_{username}"):
-            data = json.loads(await self.bot.redis_session.get(f"wyncraft_{username}"))
-        else:
-            data = await wyncraftClasses(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"wyncraft_{username}", json.dumps(data), expire=28800
-            )
+        data, uuid = await self.player_lookup(username, "wyncraft", wyncraftClasses)
         if not data:
             await ctx.send(
                 f"`{username}` has not logged onto Wynncraft or their status is not available."
@@ -76,9 +166,7 @@ class servers(commands.Cog):
             url=f"https://wynncraft.com/stats/player/{username}",
             icon_url="https://cdn.wynncraft.com/img/wynn.png",
         )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
+        embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
         embed.timestamp = ctx.message.created_at
         for i in range(len_data):
             embed.add_field(
@@ -93,53 +181,10 @@ class servers(commands.Cog):
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def gommehd(self, ctx: commands.Context, username: str):
-        """Get statistics of a player on gommehd."""
-        await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"gommehd_{username}"):
-            data = json.loads(await self.bot.redis_session.get(f"gommehd_{username}"))
-        else:
-            data = await gommehd(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"gommehd_{username}", json.dumps(data), expire=28800
-            )
-        if data == False:
-            await ctx.send(
-                f"`{username}` has not logged onto GommeHD or their status is not available."
-            )
-            return
-        embed = discord.Embed(color=0xF1A90F)
-        embed.set_author(
-            name=f"GommeHD information for {username}",
-            url=f"https://www.gommehd.net/player/index?playerName={username}",
-            icon_url="https://www.gommehd.net/images/brandmark@3x.png",
-        )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
-        embed.timestamp = ctx.message.created_at
-        for game in data["game_stats"]:
-            value = ""
-            name = list(game)
-            name_new = name[0]
-            scores = game[name_new]
-            for key in scores.keys():
-                value += f"{key}: {scores[key]}\n"
-            embed.add_field(name=name_new, value=value)
-        await ctx.send(embed=embed)
-
-    @commands.command()
-    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def veltpvp(self, ctx: commands.Context, username: str):
+    async def veltpvp(self, ctx: commands.Context, username: MinecraftPlayer):
         """Get statistics of a player on veltpvp."""
         await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"veltpvp_{username}"):
-            data = json.loads(await self.bot.redis_session.get(f"veltpvp_{username}"))
-        else:
-            data = await veltpvp(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"veltpvp_{username}", json.dumps(data), expire=28800
-            )
+        data, uuid = await self.player_lookup(username, "veltpvp", veltpvp)
         if not data:
             await ctx.send(
                 f"`{username}` has not logged onto VeltPVP or their status is not available."
@@ -151,9 +196,7 @@ class servers(commands.Cog):
             url=f"https://www.veltpvp.com/u/{username}",
             icon_url="https://www.veltpvp.com/resources/images/nav-logo.png",
         )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
+        embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
         embed.timestamp = ctx.message.created_at
         embed.add_field(
             name=("VeltPVP Stats"),
@@ -171,129 +214,10 @@ class servers(commands.Cog):
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def blocksmc(self, ctx: commands.Context, username: str):
-        """Get statistics of a player on blocksmc."""
-        await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"blocksmc_{username}"):
-            data = json.loads(await self.bot.redis_session.get(f"blocksmc_{username}"))
-        else:
-            data = await blocksmc(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"blocksmc_{username}", json.dumps(data), expire=28800
-            )
-        if not data:
-            await ctx.send(
-                f"`{username}` has not logged onto BlocksMC or their status is not available."
-            )
-            return
-        embed = discord.Embed(color=0x008CD3)
-        embed.set_author(
-            name=f"BlocksMC information for {username}",
-            url=f"https://blocksmc.com/player/{username}",
-            icon_url="https://blocksmc.com/templates3/src/logo-gray-sm.png",
-        )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
-        embed.timestamp = ctx.message.created_at
-        for game in data["game_stats"]:
-            value = ""
-            name = list(game)
-            name_new = name[0]
-            scores = game[name_new]
-            for key in scores.keys():
-                value += f"{key}: {scores[key]}\n"
-            embed.add_field(name=name_new, value=value)
-        await ctx.send(embed=embed)
-
-    @commands.command()
-    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def universocraft(self, ctx: commands.Context, username: str):
-        """Get statistics of a player on universocraft."""
-        await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"universocraft_{username}"):
-            data = json.loads(
-                await self.bot.redis_session.get(f"universocraft_{username}")
-            )
-        else:
-            data = await universocraft(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"universocraft_{username}", json.dumps(data), expire=28800
-            )
-        if not data:
-            await ctx.send(
-                f"`{username}` has not logged onto UniversoCraft or their status is not available."
-            )
-            return
-        embed = discord.Embed(color=0x82C228)
-        embed.set_author(
-            name=f"UniversoCraft information for {username}",
-            url=f"https://www.universocraft.com/members/{username}",
-            icon_url="https://www.universocraft.com/favicon.ico",
-        )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
-        embed.timestamp = ctx.message.created_at
-        for game in data["game_stats"]:
-            value = ""
-            name = list(game)
-            name_new = name[0]
-            scores = game[name_new]
-            for key in scores.keys():
-                value += f"{key}: {scores[key]}\n"
-            embed.add_field(name=name_new, value=value)
-        await ctx.send(embed=embed)
-
-    @commands.command()
-    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def minesaga(self, ctx: commands.Context, username: str):
-        """Get statistics of a player on minesaga."""
-        await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"minesaga_{username}"):
-            data = json.loads(await self.bot.redis_session.get(f"minesaga_{username}"))
-        else:
-            data = await minesaga(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"minesaga_{username}", json.dumps(data), expire=28800
-            )
-        if not data:
-            await ctx.send(
-                f"`{username}` has not logged onto Minesaga or their status is not available."
-            )
-            return
-        embed = discord.Embed(color=0x6696C2)
-        embed.set_author(
-            name=f"Minesaga information for {username}",
-            url=f"https://www.minesaga.org/members/{username}",
-            icon_url="https://www.minesaga.org/favicon.ico",
-        )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
-        embed.timestamp = ctx.message.created_at
-        for game in data["game_stats"]:
-            value = ""
-            name = list(game)
-            name_new = name[0]
-            scores = game[name_new]
-            for key in scores.keys():
-                value += f"{key}: {scores[key]}\n"
-            embed.add_field(name=name_new, value=value)
-        await ctx.send(embed=embed)
-
-    @commands.command()
-    @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def manacube(self, ctx: commands.Context, username: str):
+    async def manacube(self, ctx: commands.Context, username: MinecraftPlayer):
         """Get statistics of a player on manacube."""
         await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"manacube_{username}"):
-            data = json.loads(await self.bot.redis_session.get(f"manacube_{username}"))
-        else:
-            data = await manacube(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"manacube_{username}", json.dumps(data), expire=28800
-            )
+        data, uuid = await self.player_lookup(username, "manacube", manacube)
         if not data:
             await ctx.send(
                 f"`{username}` has not logged onto Minesaga or their status is not available."
@@ -305,9 +229,7 @@ class servers(commands.Cog):
             url=f"https://manacube.com/stats/player/{username}/",
             icon_url="https://manacube.com/styles/ndzn/manacube/img/logo-cube.png",
         )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
+        embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
         embed.timestamp = ctx.message.created_at
         embed.add_field(
             name=("Manacube Stats"),
@@ -374,64 +296,46 @@ class servers(commands.Cog):
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def hiverank(self, ctx: commands.Context, username: str):
+    async def hiverank(self, ctx: commands.Context, username: MinecraftPlayer):
         """View the rank of a player on hiverank."""
         await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"hiveMCRank_{username}"):
-            data = json.loads(
-                await self.bot.redis_session.get(f"hiveMCRank_{username}")
-            )
-        else:
-            data = await hiveMCRank(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"hiveMCRank_{username}", json.dumps(data), expire=28800
-            )
-        if not data:
+        player, uuid = await self.player_lookup(username, "hiveMCPlayer", hiveMCPlayer)
+        if not player:
             await ctx.send(
                 f"`{username}` has not logged onto Hive or there are no ranks available."
             )
             return
+        data = hiveMCRank(player)
         embed = discord.Embed(color=0xFFAF03)
         embed.set_author(
             name=f"Hive rank for {username}",
             url=f"https://www.hivemc.com/player/{username}",
             icon_url="https://www.hivemc.com/img/white-logo.png",
         )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
+        embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
         embed.timestamp = ctx.message.created_at
         embed.add_field(name="rank", value=(f"Rank: `{data['rank'][0]}`"))
         await ctx.send(embed=embed)
 
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def hivestatus(self, ctx: commands.Context, username: str):
+    async def hivestatus(self, ctx: commands.Context, username: MinecraftPlayer):
         """View the status of a player on hive"""
         await ctx.trigger_typing()
-        if await self.bot.redis_session.exists(f"hiveMCStatus_{username}"):
-            data = json.loads(
-                await self.bot.redis_session.get(f"hiveMCStatus_{username}")
-            )
-        else:
-            data = await hiveMCStatus(username, ctx.bot.http_session)
-            self.bot.redis_session.set(
-                f"hiveMCStatus_{username}", json.dumps(data), expire=28800
-            )
-        if not data:
+        player, uuid = await self.player_lookup(username, "hiveMCPlayer", hiveMCPlayer)
+        if not player:
             await ctx.send(
                 f"`{username}` has not logged onto Hive or their status is not available."
             )
             return
+        data = hiveMCStatus(player)
         embed = discord.Embed(color=0xFFAF03)
         embed.set_author(
             name=f"Hive Status for {username}",
             url=f"https://www.hivemc.com/player/{username}",
             icon_url="https://www.hivemc.com/img/white-logo.png",
         )
-        embed.set_thumbnail(
-            url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
-        )
+        embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
         embed.timestamp = ctx.message.created_at
         embed.add_field(
             name="description",
@@ -440,64 +344,100 @@ class servers(commands.Cog):
         embed.add_field(name="game", value=(f"Game: `{data['status'][0]['game']}`"))
         await ctx.send(embed=embed)
 
+    async def hive_game_stats(self, player: Player, game: str) -> Tuple[Any, str]:
+        """Get a player's cached stats in one Hive game and their uuid."""
+        code = hive_con[game]
+        return await self.player_lookup(
+            player,
+            "hiveMCGameStats",
+            lambda username, session: hiveMCGameStats(username, code, session),
+            key=f"{code}_{player.key}",
+        )
+
+    async def hive_overview(
+        self, player: Player
+    ) -> Tuple[Dict[str, dict], List[str], str]:
+        """Get a player's stats in every Hive game concurrently.
+
+        At most `constants.Hive.concurrency` games are requested at once and
+        games still missing after `constants.Hive.deadline` seconds are left
+        out, so an overview takes as long as its slowest game. Requests that
+        were already sent for those still finish and are cached.
+
+        Returns the stats of each game played, the games that failed or
+        timed out and the uuid, or the username if it can't be resolved.
+        """
+        slots = asyncio.Semaphore(constants.Hive.concurrency)
+
+        async def lookup(game: str) -> Tuple[Any, str]:
+            async with slots:
+                return await self.hive_game_stats(player, game)
+
+        tasks = {game: asyncio.ensure_future(lookup(game)) for game in hive_con}
+        try:
+            _, pending = await asyncio.wait(
+                tasks.values(), timeout=constants.Hive.deadline
+            )
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        stats, missing, uuid = {}, [], player.name
+        for game, task in tasks.items():
+            if task in pending or isinstance(task.exception(), UpstreamError):
+                missing.append(game)
+            elif task.exception() is not None:
+                raise task.exception()
+            else:
+                data, uuid = task.result()
+                if data:
+                    stats[game] = data["stats"][0]
+        return stats, missing, uuid
+
     @commands.command()
     @commands.cooldown(rate=1, per=5.0, type=commands.BucketType.user)
-    async def hivestats(self, ctx: commands.Context, username: str, game: str):
-        """Get statistics of a player on hive."""
+    async def hivestats(
+        self, ctx: commands.Context, username: MinecraftPlayer, game: str = "all"
+    ):
+        """Get statistics of a player on hive, in every game unless one is given."""
         await ctx.trigger_typing()
 
-        if game.lower() in hive_con:
-            if await self.bot.redis_session.exists(
-                f"hiveMCGameStats_{hive_con[game.lower()]}_{username}"
-            ):
-                data = json.loads(
-                    await self.bot.redis_session.get(
-                        f"hiveMCGameStats_{hive_con[game.lower()]}_{username}"
-                    )
-                )
-            else:
-                data = await hiveMCGameStats(
-                    username, hive_con[game.lower()], ctx.bot.http_session
-                )
-                self.bot.redis_session.set(
-                    f"hiveMCGameStats_{hive_con[game.lower()]}_{username}",
-                    json.dumps(data),
-                    expire=28800,
-                )
-            embed = discord.Embed(color=0xFFAF03)
-            embed.set_author(
-                name=f"Hive Stats for {username}",
-                url=f"https://www.hivemc.com/player/{username}",
-                icon_url="https://www.hivemc.com/img/white-logo.png",
-            )
-            embed.set_thumbnail(
-                url=f"https://visage.surgeplay.com/bust/{await usernameToUUID(username, ctx.bot.http_session)}"
+        if game.lower() == "all":
+            stats, missing, uuid = await self.hive_overview(username)
+            if missing and not stats:
+                raise UpstreamError(f"http://api.hivemc.com/v1/player/{username}")
+            fields = [
+                (f"{name.replace('_', ' ').upper()} Stats", hive_stats_value(scores))
+                for name, scores in stats.items()
+            ]
+            # games played without any stats worth showing are left out
+            fields = [(name, value) for name, value in fields if value]
+            note = (
+                "Stats could not be fetched for "
+                f"{humanize_list([f'`{name}`' for name in missing])}."
+                if missing
+                else None
             )
-            embed.timestamp = ctx.message.created_at
+            if not fields:
+                await ctx.send(f"No stats found. {note}" if note else "No stats found")
+                return
+            pages = []
+            for i in range(0, len(fields), GAMES_PER_PAGE):
+                embed = hive_embed(ctx, username, uuid)
+                for name, value in fields[i : i + GAMES_PER_PAGE]:
+                    embed.add_field(name=name, value=value)
+                pages.append(embed)
+            pages[0].description = note
+            await paginate(ctx, pages)
+        elif game.lower() in hive_con:
+            data, uuid = await self.hive_game_stats(username, game.lower())
+            embed = hive_embed(ctx, username, uuid)
             if not data:
                 await ctx.send("No stats found")
                 return
-            del data["stats"][0]["UUID"]
-            if "cached" in data["stats"][0]:
-                del data["stats"][0]["cached"]
-            if "firstLogin" in data["stats"][0]:
-                del data["stats"][0]["firstLogin"]
-            if "lastLogin" in data["stats"][0]:
-                del data["stats"][0]["lastLogin"]
-            if "achievements" in data["stats"][0]:
-                del data["stats"][0]["achievements"]
-            if "title" in data["stats"][0]:
-                del data["stats"][0]["title"]
-            value = ""
-            for stat in data["stats"][0]:
-                if isinstance(data["stats"][0][stat], list) or isinstance(
-                    data["stats"][0][stat], dict
-                ):
-                    pass
-                else:
-                    value += f"`{stat}`: {data['stats'][0][stat]}\n"
             embed.add_field(
-                name=f"{game.replace('_', ' ').upper()} Stats", value=value,
+                name=f"{game.replace('_', ' ').upper()} Stats",
+                value=hive_stats_value(data["stats"][0]),
             )
             await ctx.send(embed=embed)
         else:
@@ -0,0 +1,182 @@
+"""Networks whose player stats are scraped from a profile page.
+
+Each network is declared as a `Site`: where its profile page lives, what to
+read from it and how to show it. The servers cog declares a command for
+each site in `SITES` with `site_command`, which fetches the page through
+the shared cache, parses it in the parsing pool and replies with the embed
+described here.
+"""
+
+from functools import partial
+from typing import Dict, NamedTuple
+
+import discord
+
+from obsidion.utils.extract import (
+    Extractor,
+    NotFound,
+    Spec,
+    Table,
+    Text,
+    class_is,
+    has_class,
+)
+
+from .utils import scrape
+
+
+class Site(NamedTuple):
+    """A network whose stats are scraped from its profile pages."""
+
+    # command and cache namespace
+    name: str
+    # name shown to users
+    title: str
+    # page the stats are read from, formatted with the username
+    url: str
+    # page linked from the embed, formatted with the username
+    profile_url: str
+    icon: str
+    colour: int
+    spec: Spec
+    # seconds the stats of a player are cached for
+    ttl: int = 28800
+
+    async def fetch(self, username: str, session) -> dict:
+        """Get the stats of a player, False if they have none."""
+        url = self.url.format(username=username)
+        return await scrape(url, session, partial(parse_site, self.name))
+
+    def embed(self, username: str, uuid: str, data: dict) -> discord.Embed:
+        """Build the reply for the stats of a player."""
+        embed = discord.Embed(color=self.colour)
+        embed.set_author(
+            name=f"{self.title} information for {username}",
+            url=self.profile_url.format(username=username),
+            icon_url=self.icon,
+        )
+        embed.set_thumbnail(url=f"https://visage.surgeplay.com/bust/{uuid}")
+        for game in data["game_stats"]:
+            for name, scores in game.items():
+                value = ""
+                for key, score in scores.items():
+                    value += f"{key}: {score}\n"
+                embed.add_field(name=name, value=value)
+        return embed
+
+
+SITES: Dict[str, Site] = {
+    site.name: site
+    for site in (
+        Site(
+            name="blocksmc",
+            title="BlocksMC",
+            url="https://blocksmc.com/player/{username}",
+            profile_url="https://blocksmc.com/player/{username}",
+            icon="https://blocksmc.com/templates3/src/logo-gray-sm.png",
+            colour=0x008CD3,
+            spec=Spec(
+                not_found=NotFound(f"//p[{has_class('profile-rank')}]"),
+                fields={
+                    "rank": Text(f"//p[{has_class('profile-rank')}]"),
+                    "timeplayed": Text("//h1[@dir='ltr']"),
+                },
+                table=Table(
+                    rows=f"//div[{has_class('col-xl-4')}]",
+                    name=Text(f".//div[{has_class('title')}]"),
+                    stats=".//li",
+                    stat_name=Text(f".//div[{has_class('key')}]"),
+                    stat_value=Text(f".//div[{has_class('val')}]", int),
+                ),
+            ),
+        ),
+        Site(
+            name="universocraft",
+            title="UniversoCraft",
+            url="https://stats.universocraft.com/stats.php?player={username}",
+            profile_url="https://www.universocraft.com/members/{username}",
+            icon="https://www.universocraft.com/favicon.ico",
+            colour=0x82C228,
+            spec=Spec(
+                not_found=NotFound(
+                    "//p", "¡No se ha encontrado ningún usuario con ese nombre!"
+                ),
+                table=Table(
+                    rows=f"//div[{has_class('game')}]",
+                    name=Text(".//h2"),
+                    stats=f".//div[{has_class('game-stat')}]",
+                    stat_name=Text(
+                        f".//p[{has_class('game-stat-title')}]", strip=False
+                    ),
+                    stat_value=Text(
+                        f".//p[{has_class('game-stat-count')}]", strip=False
+                    ),
+                ),
+            ),
+        ),
+        Site(
+            name="minesaga",
+            title="Minesaga",
+            url="https://www.minesaga.org/player/{username}",
+            profile_url="https://www.minesaga.org/members/{username}",
+            icon="https://www.minesaga.org/favicon.ico",
+            colour=0x6696C2,
+            spec=Spec(
+                not_found=NotFound(f"//div[{has_class('dd-profile-details')}]//h4"),
+                fields={
+                    "joined": Text(f"//div[{has_class('dd-profile-details')}]//h4"),
+                    "last_seen": Text(
+                        f"(//div[{has_class('dd-profile-details')}]//span)[2]"
+                    ),
+                    "play_time": Text(
+                        f"(//div[{has_class('dd-profile-details')}]//span)[3]"
+                    ),
+                },
+                table=Table(
+                    rows=f"//div[{class_is('dd-section col-md-4')}]",
+                    name=Text(f".//div[{has_class('dd-box-title')}]"),
+                    stats=".//dl",
+                    stat_name=Text(".//dt"),
+                    stat_value=Text(".//dd", strip=False),
+                ),
+            ),
+        ),
+        Site(
+            name="gommehd",
+            title="GommeHD",
+            url="https://www.gommehd.net/player/index?playerName={username}",
+            profile_url="https://www.gommehd.net/player/index?playerName={username}",
+            icon="https://www.gommehd.net/images/brandmark@3x.png",
+            colour=0xF1A90F,
+            spec=Spec(
+                not_found=NotFound("//title", "Statistiken"),
+                table=Table(
+                    rows=f"//div[{has_class('stat-table')}]",
+                    name=Text(".//h5"),
+                    stats=".//li",
+                    stat_name=Text("text()"),
+                    stat_value=Text(f".//span[{has_class('score')}]", strip=False),
+                ),
+            ),
+        ),
+    )
+}
+
+# compiled on import, which happens at cog load and before the parsing
+# workers are forked, so they inherit them
+EXTRACTORS: Dict[str, Extractor] = {
+    name: Extractor(site.spec) for name, site in SITES.items()
+}
+
+
+def parse_site(name: str, html: str) -> dict:
+    """Extract the stats of a player from a page of a site.
+
+    Args:
+        name (str): name of the site
+        html (str): the page
+
+    Returns:
+        dict: stats of the player or False if the page says they don't exist
+    """
+    return EXTRACTORS[name](html)
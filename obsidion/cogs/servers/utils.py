@@ -1,75 +1,91 @@
-import json
-from bs4 import BeautifulSoup
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+from obsidion.utils import codec
+from obsidion.utils.extract import XPath, class_is, first, has_class, parse, text
+from obsidion.utils.http import timeout_for
+from obsidion.utils.parsing import parsing_pool
+from obsidion.utils.utils import UpstreamError, upstream
 
 
 async def get_html(url, session):
-    async with session.get(url) as resp:
-        if resp.status == 200:
-            html = await resp.text()
-            return html
-        return False
+    async with upstream(url):
+        async with session.get(url, timeout=timeout_for(url)) as resp:
+            if resp.status == 200:
+                html = await resp.text()
+                return html
+            if resp.status >= 500:
+                raise UpstreamError(url, resp.status)
+            return False
 
 
 async def get_json(url, session):
-    async with session.get(url) as resp:
-        if resp.status == 200:
-            data = await resp.json()
-            return data
+    async with upstream(url):
+        async with session.get(url, timeout=timeout_for(url)) as resp:
+            if resp.status == 200:
+                data = codec.loads(await resp.read())
+                return data
+            if resp.status >= 500:
+                raise UpstreamError(url, resp.status)
+            return False
+
+
+async def scrape(url, session, parser):
+    """Download a page and extract its data in the parsing pool.
+
+    Args:
+        url (str): url of the page
+        session ([type]): aiohttp session to use
+        parser (Callable[[str], Union[dict, bool]]): module level function that
+            extracts the data from the html or returns False if there is none
+
+    Raises:
+        UpstreamError: the page could not be downloaded or parsed in time
+
+    Returns:
+        Union[dict, bool]: data of the page or False if there is none
+    """
+    html = await get_html(url, session)
+    if html == False:
         return False
+    try:
+        return await parsing_pool.run(parser, html)
+    except (asyncio.TimeoutError, BrokenProcessPool) as e:
+        raise UpstreamError(url) from e
 
 
-async def hiveMCAchievements(username, session):
+async def hiveMCPlayer(username, session):
     url = f"http://api.hivemc.com/v1/player/{username}"
-    json_data = await get_json(url, session)
-    data = {"all_achievements": []}
-    if json_data == False:
-        return False
-    for ach in json_data["achievements"]:
-        data["all_achievements"].append(ach)
-    return data
+    return await get_json(url, session)
 
 
-async def hiveMCStatus(username, session):
-    url = f"http://api.hivemc.com/v1/player/{username}"
-    json_data = await get_json(url, session)
-    str_json = json.dumps(json_data)
-    json_new = json.loads(str_json)
-    if json_new == False:
-        return False
-    data = {"status": []}
-    for _ in json_new["status"]:
-        thing = json_new["status"]
-        data["status"].append(thing)
-    return data
+def hiveMCAchievements(player):
+    return {"all_achievements": list(player["achievements"])}
+
+
+def hiveMCStatus(player):
+    return {"status": [player["status"]]}
 
 
 async def hiveMCGameStats(username, game, session):
     url = f"http://api.hivemc.com/v1/player/{username}/{game}"
-    json_data = await get_json(url, session)
-    str_json = json.dumps(json_data)
-    json_new = json.loads(str_json)
+    json_new = await get_json(url, session)
     if not json_new:
         return False
     data = {"stats": [json_new]}
     return data
 
 
-async def hiveMCRank(username, session):
-    url = f"http://api.hivemc.com/v1/player/{username}"
-    json_data = await get_json(url, session)
-    str_json = json.dumps(json_data)
-    json_new = json.loads(str_json)
-    if json_new == False:
-        return False
-    rank = json_new["rankName"]
-    data = {"rank": [rank]}
-    return data
+def hiveMCRank(player):
+    return {"rank": [player["rankName"]]}
 
 
 async def manacube(username, session):
     url = f"https://manacube.com/stats_data/fetch.php?username={username}"
     json_data = await get_html(url, session)
-    data = json.loads(json_data)
+    if json_data == False:
+        return False
+    data = codec.loads(json_data)
     if data["exists"] == False:
         return False
     return data
@@ -77,9 +93,7 @@ async def manacube(username, session):
 
 async def wyncraftClasses(username, session):
     url = f"https://api.wynncraft.com/v2/player/{username}/stats"
-    json_data = await get_json(url, session)
-    str_json = json.dumps(json_data)
-    json_new = json.loads(str_json)
+    json_new = await get_json(url, session)
     data = {"classes": []}
     if json_new == False:
         return False
@@ -98,128 +112,37 @@ async def wyncraftClasses(username, session):
     return data
 
 
-async def blocksmc(username, session):
-    url = f"https://blocksmc.com/player/{username}"
-    html = await get_html(url, session)
-    soup = BeautifulSoup(html, "lxml")
-    try:
-        rank = (
-            soup.find("p", {"class": ["profile-rank"]})
-            .get_text()
-            .replace("\n", "")
-            .strip()
-        )
-    except:
-        return False
-
-    timeplayed = soup.find("h1", {"dir": ["ltr"]}).get_text().replace("\n", "").strip()
-    data = {"rank": rank, "timeplayed": timeplayed, "game_stats": []}
-
-    for game in soup.find_all("div", {"class": "col-xl-4"}):
-        stats = {}
-        game_name = (
-            game.find("div", {"class": "title"}).get_text().replace("\n", "").strip()
-        )
-        for stat in game.find_all("li"):
-            stat_name = (
-                stat.find("div", {"class": "key"}).get_text().replace("\n", "").strip()
-            )
-            stat_val = int(stat.find("div", {"class": "val"}).get_text())
-            stats[stat_name] = stat_val
-        data["game_stats"].append({game_name: stats})
-    return data
-
+VELTPVP_RANK = XPath("//div[@id='profile']//h2")
+VELTPVP_LAST_SEEN = XPath(f"//div[{has_class('bottom')}]")
+VELTPVP_STATUS = XPath(f"//div[{has_class('top')}]")
+VELTPVP_INFO = XPath(f"//div[{has_class('element')}]")
+VELTPVP_FIRST_GAME = XPath(f"//a[{has_class('server')}]")
+VELTPVP_GAMES = XPath(f"//div[{has_class('server')}]")
+VELTPVP_UNKNOWN = XPath(f".//div[{class_is('server unknown')}]")
+VELTPVP_GAME_NAME = XPath(f".//div[{has_class('server-header')}]")
+VELTPVP_STATS = XPath(f".//div[{has_class('server-stat')}]")
+VELTPVP_STAT_NAME = XPath(f".//div[{has_class('server-stat-description')}]")
+VELTPVP_STAT_VALUE = XPath(f".//div[{has_class('server-stat-number')}]")
 
-async def universocraft(username, session):
-    url = f"https://stats.universocraft.com/stats.php?player={username}"
-    html = await get_html(url, session)
-    soup = BeautifulSoup(html, "lxml")
-    data = {"game_stats": []}
-    if (
-        soup.find("p").get_text()
-        == "¡No se ha encontrado ningún usuario con ese nombre!"
-    ):
-        return False
-    for game in soup.find_all("div", {"class": "game"}):
-        stats = {}
-        game_name = game.find("h2").get_text().replace("\n", "").strip()
-        for stat in game.find_all("div", {"class": "game-stat"}):
-            stat_val = stat.find("p", {"class": "game-stat-count"}).get_text()
-            stat_name = stat.find("p", {"class": "game-stat-title"}).get_text()
-            stats[stat_name] = stat_val
-        data["game_stats"].append({game_name: stats})
-    return data
 
-
-async def minesaga(username, session):
-    url = f"https://www.minesaga.org/player/{username}"
-    html = await get_html(url, session)
-    soup = BeautifulSoup(html, "lxml")
-    main_info = soup.find("div", {"class": ["dd-profile-details"]})
-    try:
-        joined = main_info.find("h4").get_text().strip()
-    except:
-        return False
-    last_seen = main_info.findAll("span")[1].get_text().strip()
-    play_time = main_info.findAll("span")[2].get_text().strip()
-    data = {
-        "joined": joined,
-        "last_seen": last_seen,
-        "play_time": play_time,
-        "game_stats": [],
-    }
-
-    for game in soup.find_all("div", {"class": "dd-section col-md-4"}):
-        stats = {}
-        game_name = (
-            game.find("div", {"class": "dd-box-title"})
-            .get_text()
-            .replace("\n", "")
-            .strip()
-        )
-        for stat in game.find_all("dl"):
-            stat_name = stat.find("dt").get_text().replace("\n", "").strip()
-            stat_val = stat.find("dd").get_text()
-            stats[stat_name] = stat_val
-        data["game_stats"].append({game_name: stats})
-
-    return data
-
-
-async def gommehd(username, session):
-    url = f"https://www.gommehd.net/player/index?playerName={username}"
-    html = await get_html(url, session)
-    soup = BeautifulSoup(html, "lxml")
-    data = {"game_stats": []}
-    if soup.find("title").get_text() == "Statistiken":
-        return False
-    for game in soup.find_all("div", {"class": "stat-table"}):
-        stats = {}
-        game_name = game.find("h5").get_text().replace("\n", "").strip()
-        for stat in game.find_all("li"):
-            stat_val = stat.find("span", {"class": "score"}).get_text()
-            stat_name = stat.get_text().replace("\n", "").strip().replace(stat_val, "")
-            stats[stat_name] = stat_val
-        data["game_stats"].append({game_name: stats})
-    return data
+def _veltpvp_game(game):
+    game_name = text(first(VELTPVP_GAME_NAME, game)).strip()
+    stats = {}
+    for stat in VELTPVP_STATS(game):
+        stat_name = text(first(VELTPVP_STAT_NAME, stat)).strip()
+        stat_val = text(first(VELTPVP_STAT_VALUE, stat)).strip()
+        stats[stat_name] = stat_val
+    return {game_name: stats}
 
 
-async def veltpvp(username, session):
-    url = f"https://www.veltpvp.com/u/{username}"
-    html = await get_html(url, session)
-    if html == False:
-        return False
-    soup = BeautifulSoup(html, "lxml")
-    rank = soup.find("div", {"id": "profile"}).find("h2").get_text().strip()
+def parse_veltpvp(html):
+    root = parse(html)
+    rank = text(first(VELTPVP_RANK, root)).strip()
     last_seen = (
-        soup.find("div", {"class": "bottom"})
-        .get_text()
-        .split("\n")[2]
-        .replace("\xa0", " ")
-        .strip()
+        text(first(VELTPVP_LAST_SEEN, root)).split("\n")[2].replace("\xa0", " ").strip()
     )
-    current_status = soup.find("div", {"class": "top"}).get_text().strip()
-    info = soup.find_all("div", {"class": "element"})[1].get_text().split("\n")
+    current_status = text(first(VELTPVP_STATUS, root)).strip()
+    info = text(VELTPVP_INFO(root)[1]).split("\n")
     first_joined = info[3].strip()
     time_played = info[5].replace("\xa0", " ").strip()
     monthly_views = info[7].strip()
@@ -234,31 +157,15 @@ async def veltpvp(username, session):
     }
 
     # first stat is special
-    first_game = soup.find("a", {"class": "server"})
-    game_name = first_game.find("div", {"class": "server-header"}).get_text().strip()
-    stats = {}
-    for stat in first_game.find_all("div", {"class": "server-stat"}):
-        stat_name = (
-            stat.find("div", {"class": "server-stat-description"}).get_text().strip()
-        )
-        stat_val = stat.find("div", {"class": "server-stat-number"}).get_text().strip()
-        stats[stat_name] = stat_val
-    data["game_stats"].append({game_name: stats})
+    data["game_stats"].append(_veltpvp_game(first(VELTPVP_FIRST_GAME, root)))
 
-    for game in soup.find_all("div", {"class": "server"}):
-        if not game.find("div", {"class": "server unknown"}):
+    for game in VELTPVP_GAMES(root):
+        if first(VELTPVP_UNKNOWN, game) is None:
             break
-        game_name = game.find("div", {"class": "server-header"}).get_text().strip()
-        stats = {}
-        for stat in game.find_all("div", {"class": "server-stat"}):
-            stat_name = (
-                stat.find("div", {"class": "server-stat-description"})
-                .get_text()
-                .strip()
-            )
-            stat_val = (
-                stat.find("div", {"class": "server-stat-number"}).get_text().strip()
-            )
-            stats[stat_name] = stat_val
-        data["game_stats"].append({game_name: stats})
+        data["game_stats"].append(_veltpvp_game(game))
     return data
+
+
+async def veltpvp(username, session):
+    url = f"https://www.veltpvp.com/u/{username}"
+    return await scrape(url, session, parse_veltpvp)
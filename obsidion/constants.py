@@ -90,6 +90,11 @@ def _recursive_update(original, new):
         if isinstance(value, Mapping):
             if not any(isinstance(subvalue, Mapping) for subvalue in value.values()):
                 original[key].update(new[key])
+            else:
+                # sections keyed by name, like `http.timeouts` hosts or `retry`
+                # endpoints, also take entries the defaults don't list
+                for subkey, subvalue in new[key].items():
+                    original[key].setdefault(subkey, subvalue)
             _recursive_update(original[key], new[key])
         else:
             original[key] = new[key]
@@ -223,6 +228,70 @@ class Redis(metaclass=YAMLGetter):
     host: str
     port: int
     password: Optional[str]
+    local_store: str
+    max_memory: int
+    sqlite_path: str
+
+
+class Cache(metaclass=YAMLGetter):
+    section = "cache"
+
+    memory_budget: int
+    memory_ttl: dict
+    missing_ttl: int
+    error_ttl: int
+    binary: bool
+    compress_threshold: Optional[int]
+
+
+class Mojang(metaclass=YAMLGetter):
+    section = "mojang"
+
+    batch_window: float
+    identity_max_age: int
+    rate_limit: int
+    rate_period: int
+    background_reserve: int
+    max_wait: float
+
+
+class Http(metaclass=YAMLGetter):
+    section = "http"
+
+    limit: int
+    limit_per_host: int
+    keepalive_timeout: float
+    dns_ttl: int
+    conditional_ttl: int
+    timeouts: dict
+
+
+class Breaker(metaclass=YAMLGetter):
+    section = "breaker"
+
+    failure_threshold: int
+    reset_timeout: float
+
+
+class Parsing(metaclass=YAMLGetter):
+    section = "parsing"
+
+    workers: int
+    max_queue: int
+    timeout: float
+
+
+class Retry(metaclass=YAMLGetter):
+    section = "retry"
+
+    server_status: dict
+
+
+class Hive(metaclass=YAMLGetter):
+    section = "hive"
+
+    concurrency: int
+    deadline: float
 
 
 class Stats(metaclass=YAMLGetter):
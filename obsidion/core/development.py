@@ -1,6 +1,9 @@
 import logging
 from discord.ext import commands
 
+from obsidion.utils.breaker import breakers
+from obsidion.utils.chat_formatting import box
+
 log = logging.getLogger(__name__)
 
 
@@ -60,6 +63,51 @@ class development(commands.Cog):
                 f"{ctx.message.author.mention}, :white_check_mark: The cog {module} has been succesfully reloaded"
             )
 
+    @commands.command(hidden=True)
+    async def cachestats(self, ctx: commands.Context):
+        """Show cache hit rates and latency per namespace."""
+        cache = self.bot.cache
+        lines = [
+            f"{'namespace':<20}{'hit':>8}{'miss':>8}{'stale':>8}{'error':>8}"
+            f"{'hit%':>7}{'p50ms':>7}{'p95ms':>7}"
+        ]
+        for namespace, stats in sorted(cache.stats.items()):
+            counts = stats.counts
+            served = counts["hit"] + counts["stale"]
+            lines.append(
+                f"{namespace:<20}{counts['hit']:>8}{counts['miss']:>8}"
+                f"{counts['stale']:>8}{counts['error']:>8}"
+                f"{served / stats.total:>7.0%}"
+                f"{stats.percentile(50):>7}{stats.percentile(95):>7}"
+            )
+        memory = cache.memory
+        if cache.memory_enabled:
+            lines.append(
+                f"\nmemory tier: {len(memory)} entries, {memory.size:,}/{memory.budget:,} bytes, "
+                f"{memory.hits} hits, {memory.misses} misses"
+            )
+        else:
+            lines.append("\nmemory tier: off, the store is already in process")
+        http_cache = self.bot.http_cache
+        lines.append(
+            f"conditional requests: {http_cache.revalidated} revalidated, "
+            f"{http_cache.downloaded} downloaded"
+        )
+        await ctx.send(box("\n".join(lines)))
+
+    @commands.command(hidden=True)
+    async def breakerstats(self, ctx: commands.Context):
+        """Show the circuit breaker of each upstream host."""
+        lines = [
+            f"{'host':<28}{'state':>10}{'fails':>7}{'trips':>7}{'rejected':>10}{'retry':>7}"
+        ]
+        for host, breaker in sorted(breakers.breakers.items()):
+            lines.append(
+                f"{host:<28}{breaker.state:>10}{breaker.failures:>7}"
+                f"{breaker.trips:>7}{breaker.rejected:>10}{breaker.retry_in:>6.0f}s"
+            )
+        await ctx.send(box("\n".join(lines)))
+
     @commands.command(hidden=True)
     async def shutdown(self, ctx: commands.Context):
         """shutdown the bot"""
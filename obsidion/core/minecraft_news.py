@@ -6,6 +6,7 @@ import feedparser
 from discord.ext import commands, tasks
 
 from obsidion.bot import Obsidion
+from obsidion.utils.utils import UpstreamError
 
 Minecraft_News_RSS = "https://www.minecraft.net/en-us/feeds/community-content/rss"
 Categories = ("Minecraft Builds", "News", "Deep Dives", "Guides")
@@ -19,13 +20,15 @@ class MinecraftNews(commands.Cog):
     def __init__(self, bot: Obsidion):
         self.bot = bot
         self.last_data = datetime.now()
+        # retry with backoff while the feed is down instead of stopping
+        self.get_media.add_exception_type(UpstreamError)
         self.get_media.start()
 
     @tasks.loop(minutes=10)
     async def get_media(self) -> None:
-        async with self.bot.http_session.get(Minecraft_News_RSS) as resp:
-            text = await resp.text()
-        data = feedparser.parse(text)
+        data = await self.bot.http_cache.get(Minecraft_News_RSS, parse=feedparser.parse)
+        if not data:
+            return
 
         # select the most recent post
         latest_post = data["entries"][0]
@@ -73,6 +76,11 @@ class MinecraftNews(commands.Cog):
         message = await channel.send(embed=embed)
         await message.publish()
 
+    @get_media.before_loop
+    async def before_get_media(self) -> None:
+        """Wait for redis, which the feed is cached in."""
+        await self.bot.redis_ready.wait()
+
     def cog_unload(self) -> None:
         """Stop news posting tasks on cog unload."""
         self.get_media.cancel()
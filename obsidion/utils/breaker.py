@@ -0,0 +1,147 @@
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+from yarl import URL
+
+from obsidion import constants
+
+__all__ = [
+    "CircuitBreaker",
+    "BreakerRegistry",
+    "breakers",
+    "CLOSED",
+    "OPEN",
+    "HALF_OPEN",
+]
+
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Tracks the health of one upstream host.
+
+    After `failure_threshold` failures in a row the breaker opens and every
+    request fails straight away. Once `reset_timeout` seconds have passed a
+    single probe request is let through, which closes the breaker if it
+    succeeds and opens it again if it fails.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        listener: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.listener = listener
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.trips = 0
+        self._probing = False
+
+    def _emit(self, event: str) -> None:
+        if self.listener is not None:
+            self.listener(self.host, event)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        log.info(f"Circuit breaker for {self.host} is now {state}")
+        self.state = state
+        self._emit(state)
+
+    def allow(self) -> bool:
+        """Check whether a request to the host may be made.
+
+        Returns:
+            bool: False if the request should fail straight away
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                self._emit("rejected")
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self.rejected += 1
+                self._emit("rejected")
+                return False
+            self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        """Record that the host answered."""
+        self._probing = False
+        self.failures = 0
+        self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Record that the host failed or didn't answer."""
+        self._probing = False
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            if self.state != OPEN:
+                self.trips += 1
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give up a request without judging the host, eg. when it was cancelled."""
+        self._probing = False
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until a probe request will be let through."""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class BreakerRegistry:
+    """Circuit breakers of every upstream host, created on first use.
+
+    `listener` is called with the host and event whenever a breaker changes
+    state or rejects a request, so they can be forwarded to statsd.
+    """
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.listener: Optional[Callable[[str, str], None]] = None
+
+    def _notify(self, host: str, event: str) -> None:
+        if self.listener is not None:
+            self.listener(host, event)
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Get the breaker of the host of a url.
+
+        Args:
+            url (str): url about to be requested
+
+        Returns:
+            CircuitBreaker: breaker of the host
+        """
+        host = URL(url).host
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(
+                host,
+                constants.Breaker.failure_threshold,
+                constants.Breaker.reset_timeout,
+                self._notify,
+            )
+        return breaker
+
+
+breakers = BreakerRegistry()
@@ -0,0 +1,394 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from obsidion import constants
+from obsidion.utils.codec import Codec
+from obsidion.utils.memory_redis import MemoryRedis
+from obsidion.utils.utils import UpstreamError
+
+log = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Any]]
+
+# rough per entry bookkeeping cost on top of the key and value
+ENTRY_OVERHEAD = 64
+
+# outcomes of a lookup, each entry is stored as
+# ``{outcome: value, "fresh_until": timestamp}``
+FOUND = "found"
+MISSING = "missing"
+ERROR = "error"
+OUTCOMES = {FOUND, MISSING, ERROR}
+
+# set while loaders run to refresh stale data in the background
+refreshing: ContextVar[bool] = ContextVar("refreshing", default=False)
+
+# upper bounds in milliseconds of the cache access latency histogram buckets
+LATENCY_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class MemoryCache:
+    """Bounded in-process LRU cache with per-namespace time to live.
+
+    Entries are kept encoded so callers mutating a returned value can't
+    corrupt the cached copy.
+    """
+
+    def __init__(self, budget: int, ttls: Dict[str, int]):
+        self.budget = budget
+        self.ttls = ttls
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, bytes]]" = OrderedDict()
+
+    def ttl_for(self, namespace: str) -> int:
+        """Get the in-process time to live for a namespace.
+
+        Args:
+            namespace (str): cache namespace
+
+        Returns:
+            int: time to live in seconds
+        """
+        return self.ttls.get(namespace, self.ttls.get("default", 0))
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get an encoded value, marking it as recently used.
+
+        Args:
+            key (str): full cache key
+
+        Returns:
+            Optional[bytes]: the encoded value or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, _, raw = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return raw
+
+    def set(self, key: str, raw: bytes, ttl: float) -> None:
+        """Store an encoded value, evicting the least recently used entries to stay in budget.
+
+        Args:
+            key (str): full cache key
+            raw (bytes): encoded value
+            ttl (float): time to live in seconds
+        """
+        if key in self._entries:
+            self._remove(key)
+        size = len(key) + len(raw) + ENTRY_OVERHEAD
+        if ttl <= 0 or size > self.budget:
+            return
+        self._entries[key] = (time.monotonic() + ttl, size, raw)
+        self.size += size
+        while self.size > self.budget:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class NamespaceStats:
+    """Access counters and a latency histogram for one cache namespace."""
+
+    def __init__(self):
+        self.counts = {"hit": 0, "miss": 0, "stale": 0, "error": 0}
+        # the last bucket holds everything slower than the last bound
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, outcome: str, elapsed: float) -> None:
+        """Record one cache access.
+
+        Args:
+            outcome (str): `hit`, `miss`, `stale` or `error`
+            elapsed (float): duration of the access in seconds
+        """
+        self.counts[outcome] += 1
+        self.latency[bisect.bisect_left(LATENCY_BUCKETS, elapsed * 1000)] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Estimate a latency percentile from the histogram.
+
+        Args:
+            percent (float): percentile to estimate, eg. 95
+
+        Returns:
+            Optional[float]: upper bound in milliseconds of the bucket holding
+                the percentile, inf if beyond the last bound or None without data
+        """
+        total = sum(self.latency)
+        if not total:
+            return None
+        rank = total * percent / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.latency):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single call.
+
+    Callers arriving while a call for their key is in flight await its
+    result instead of starting their own. The call runs in its own task so a
+    cancelled caller doesn't cancel it for everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Loader) -> Any:
+        """Run `fn` for `key` unless a call for `key` is already in flight.
+
+        Args:
+            key (str): key identifying the call
+            fn (Loader): coroutine function to run
+
+        Returns:
+            Any: the result of the shared call
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(fn())
+            self._calls[key] = call
+            call.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(call)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+
+class Cache:
+    """Read-through cache on top of the bot's redis session.
+
+    Values are stored under ``{namespace}_{key}`` using the configured codec. A small in-process
+    tier sits in front of redis for hot keys, unless redis is itself the
+    in-process `MemoryRedis`, and concurrent misses for the same key share
+    one load.
+
+    Every entry records whether the lookup found something, found nothing or
+    failed upstream, so lookups that found nothing and upstream failures can
+    be cached for much shorter than real data.
+
+    Accesses are counted per namespace in `stats` and forwarded to statsd
+    when stats are enabled.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.memory = MemoryCache(
+            constants.Cache.memory_budget, constants.Cache.memory_ttl
+        )
+        self.inflight = SingleFlight()
+        self.stats: Dict[str, NamespaceStats] = defaultdict(NamespaceStats)
+        self.codec = Codec(
+            binary=constants.Cache.binary,
+            compress_threshold=constants.Cache.compress_threshold,
+        )
+
+    @property
+    def memory_enabled(self) -> bool:
+        """Whether the in-process tier is used.
+
+        `MemoryRedis` already keeps entries in process, so a memory tier in
+        front of it would only store every entry twice.
+        """
+        return not isinstance(self.bot.redis_session, MemoryRedis)
+
+    @staticmethod
+    def make_key(namespace: str, key: str) -> str:
+        """Build the redis key for a namespace and key.
+
+        Args:
+            namespace (str): cache namespace, eg. `wyncraft`
+            key (str): key within the namespace
+
+        Returns:
+            str: full redis key
+        """
+        return f"{namespace}_{key}"
+
+    async def get_or_fetch(
+        self,
+        namespace: str,
+        key: str,
+        loader: Loader,
+        *,
+        expire: int,
+        negative: bool = True,
+        stale: int = 0,
+    ) -> Any:
+        """Get a value from the cache, calling `loader` and storing its result on a miss.
+
+        An in-process hit costs nothing, a redis hit a single GET and a miss
+        a single awaited SET. A falsy result from `loader` counts as not found
+        and an `UpstreamError` as an upstream failure, both of which are cached
+        with their own short time to live when `negative` is set.
+
+        With `stale` set, data older than `expire` is still served for up to
+        `stale` more seconds while it is refreshed in the background.
+
+        Args:
+            namespace (str): cache namespace, eg. `wyncraft`
+            key (str): key within the namespace
+            loader (Loader): coroutine function producing the value on a miss
+            expire (int): time to live of the cached value in seconds
+            negative (bool, optional): cache not found and failed lookups. Defaults to True.
+            stale (int, optional): seconds expired data may still be served for. Defaults to 0.
+
+        Raises:
+            UpstreamError: the upstream failed now or did so recently
+
+        Returns:
+            Any: the cached or freshly loaded value
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            value, outcome = await self._get_or_fetch(
+                namespace, key, loader, expire, negative, stale
+            )
+        finally:
+            self._record(namespace, outcome, time.perf_counter() - start)
+        return value
+
+    async def _get_or_fetch(
+        self,
+        namespace: str,
+        key: str,
+        loader: Loader,
+        expire: int,
+        negative: bool,
+        stale: int,
+    ) -> Tuple[Any, str]:
+        full_key = self.make_key(namespace, key)
+        memory_ttl = 0
+        if self.memory_enabled:
+            memory_ttl = min(self.memory.ttl_for(namespace), expire + stale)
+
+        entry = None
+        from_redis = False
+        raw = self.memory.get(full_key) if memory_ttl > 0 else None
+        if raw is None and full_key not in self.inflight:
+            raw = await self.bot.redis_session.get(full_key)
+            from_redis = True
+        if raw is not None:
+            entry = self._decode(full_key, raw)
+        if from_redis and entry is not None:
+            # don't keep the copy in memory for longer than redis keeps the
+            # entry, or it could be served past `expire + stale`
+            left = entry["fresh_until"] - time.time()
+            if FOUND in entry:
+                left += stale
+            self.memory.set(full_key, raw, min(memory_ttl, left))
+
+        def load() -> Awaitable[dict]:
+            return self._load(
+                full_key, loader, expire, negative, stale, memory_ttl, entry
+            )
+
+        outcome = "hit"
+        if entry is None:
+            outcome = "miss"
+            entry = await self.inflight.do(full_key, load)
+        elif entry["fresh_until"] < time.time():
+            if FOUND in entry and stale:
+                outcome = "stale"
+                if full_key not in self.inflight:
+                    asyncio.ensure_future(self._refresh(full_key, load))
+            else:
+                outcome = "miss"
+                entry = await self.inflight.do(full_key, load)
+
+        if ERROR in entry:
+            raise UpstreamError(**entry[ERROR])
+        return entry.get(FOUND, entry.get(MISSING)), outcome
+
+    def _record(self, namespace: str, outcome: str, elapsed: float) -> None:
+        self.stats[namespace].record(outcome, elapsed)
+        if constants.Stats.enabled:
+            self.bot.stats.incr(f"cache.{namespace}.{outcome}")
+            self.bot.stats.timing(f"cache.{namespace}.latency", elapsed * 1000)
+
+    async def _refresh(self, full_key: str, load: Loader) -> None:
+        refreshing.set(True)
+        try:
+            await self.inflight.do(full_key, load)
+        except Exception:
+            log.exception(f"Failed to refresh cache entry `{full_key}`.")
+
+    async def _load(
+        self,
+        full_key: str,
+        loader: Loader,
+        expire: int,
+        negative: bool,
+        stale: int,
+        memory_ttl: int,
+        previous: Optional[dict],
+    ) -> dict:
+        try:
+            value = await loader()
+        except UpstreamError as e:
+            if previous is not None and FOUND in previous:
+                log.warning(f"Keeping stale cache entry `{full_key}`: {e}")
+                return previous
+            if not negative:
+                raise
+            entry = {ERROR: {"url": e.url, "status": e.status}}
+            ttl = constants.Cache.error_ttl
+        else:
+            if value:
+                entry = {FOUND: value}
+                ttl = expire
+            elif negative:
+                entry = {MISSING: value}
+                ttl = constants.Cache.missing_ttl
+            else:
+                return {MISSING: value}
+        ttl = min(ttl, expire)
+        entry["fresh_until"] = time.time() + ttl
+        if FOUND in entry:
+            ttl += stale
+        raw = self.codec.encode(entry)
+        self.memory.set(full_key, raw, min(ttl, memory_ttl))
+        await self.bot.redis_session.set(full_key, raw, expire=ttl)
+        return entry
+
+    def _decode(self, full_key: str, raw: bytes) -> Optional[dict]:
+        try:
+            entry = self.codec.decode(raw)
+        except ValueError:
+            entry = None
+        if (
+            not isinstance(entry, dict)
+            or "fresh_until" not in entry
+            or len(OUTCOMES & entry.keys()) != 1
+        ):
+            log.warning(f"Ignoring cache entry `{full_key}` in an unknown format.")
+            return None
+        return entry
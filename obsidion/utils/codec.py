@@ -0,0 +1,109 @@
+import json
+import zlib
+from typing import Any, Optional, Union
+
+# Let's not force these dependencies, orjson is much faster than the stdlib
+# and msgpack is only needed for the binary cache encoding.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+__all__ = ["loads", "dumps", "Codec"]
+
+JSON = b"j"
+MSGPACK = b"m"
+ZLIB = b"z"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode json using the fastest available backend.
+
+    Args:
+        data (Union[bytes, str]): json document
+
+    Returns:
+        Any: decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object to json using the fastest available backend.
+
+    Args:
+        obj (Any): object to encode
+
+    Returns:
+        bytes: utf-8 json document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+class Codec:
+    """Encodes cache payloads.
+
+    Payloads are prefixed with a tag byte naming their encoding so the
+    encoding can be changed without flushing the cache. Untagged payloads are
+    read as plain json.
+    """
+
+    def __init__(self, binary: bool = False, compress_threshold: Optional[int] = None):
+        if binary and msgpack is None:
+            raise RuntimeError("msgpack must be installed to use the binary encoding")
+        self.binary = binary
+        self.compress_threshold = compress_threshold
+
+    def encode(self, obj: Any) -> bytes:
+        """Encode an object, compressing it if it's over the threshold.
+
+        Args:
+            obj (Any): object to encode
+
+        Returns:
+            bytes: tagged payload
+        """
+        if self.binary:
+            data = MSGPACK + msgpack.packb(obj, use_bin_type=True)
+        else:
+            data = JSON + dumps(obj)
+        if self.compress_threshold is not None and len(data) > self.compress_threshold:
+            data = ZLIB + zlib.compress(data)
+        return data
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """Decode a payload written by any codec configuration.
+
+        Args:
+            data (bytes): tagged or plain json payload
+
+        Raises:
+            ValueError: the payload could not be decoded
+
+        Returns:
+            Any: decoded object
+        """
+        tag = data[:1]
+        if tag == ZLIB:
+            try:
+                data = zlib.decompress(data[1:])
+            except zlib.error as e:
+                raise ValueError(e) from e
+            tag = data[:1]
+        if tag == JSON:
+            return loads(data[1:])
+        if tag == MSGPACK:
+            if msgpack is None:
+                raise ValueError("msgpack payload but msgpack is not installed")
+            return msgpack.unpackb(data[1:], raw=False)
+        return loads(data)
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Iterable, List, Optional, Union
+
+from discord.ext import commands
+
+from obsidion.utils.mojang import BATCH_SIZE, USERNAME_RE, UsernameResolver
+
+# as many players as fit in one bulk Mojang request
+MAX_PLAYERS = BATCH_SIZE
+
+
+class Player:
+    """A Minecraft player named in a command.
+
+    The UUID lookup starts on the first call to `uuid` and is shared by every
+    later call, so arguments that are rejected before then never cost a
+    request. Commands gather it with their other fetches to run alongside.
+    """
+
+    __slots__ = ("name", "_resolver", "_uuid")
+
+    def __init__(self, name: str, resolver: UsernameResolver):
+        self.name = name
+        self._resolver = resolver
+        self._uuid: Optional[asyncio.Task] = None
+
+    @property
+    def key(self) -> str:
+        """Case insensitive cache key for the player."""
+        return self.name.lower()
+
+    async def uuid(self) -> Union[str, bool]:
+        """Get the uuid of the player.
+
+        Raises:
+            UpstreamError: Mojang could not be reached
+
+        Returns:
+            Union[str, bool]: uuid of the player or False if the name is not taken
+        """
+        if self._uuid is None:
+            self._uuid = asyncio.ensure_future(self._resolver.resolve(self.name))
+            # a caller that is cancelled leaves the lookup running, so don't
+            # let asyncio complain if nobody retrieves its exception
+            self._uuid.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+        return await asyncio.shield(self._uuid)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class MinecraftPlayer(commands.Converter):
+    """Convert a username into a `Player`.
+
+    Names that can't be a Minecraft username are rejected without a request,
+    as are players past the first `MAX_PLAYERS` given to one command.
+    """
+
+    async def convert(self, ctx: commands.Context, argument: str) -> Player:
+        if not USERNAME_RE.fullmatch(argument):
+            raise commands.BadArgument(
+                f"`{argument}` is not a valid Minecraft username."
+            )
+        # ctx.args holds the arguments converted so far
+        if sum(isinstance(arg, Player) for arg in ctx.args) >= MAX_PLAYERS:
+            raise commands.BadArgument(
+                f"You can only look up {MAX_PLAYERS} players at once."
+            )
+        return Player(argument, ctx.bot.username_resolver)
+
+
+def unique_players(players: Iterable[Player]) -> List[Player]:
+    """Drop players named more than once, keeping the first mention.
+
+    Args:
+        players (Iterable[Player]): players given to a command
+
+    Returns:
+        List[Player]: each player once, in the order given
+    """
+    unique = {}
+    for player in players:
+        unique.setdefault(player.key, player)
+    return list(unique.values())
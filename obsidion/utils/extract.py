@@ -0,0 +1,206 @@
+"""Helpers for pulling a handful of values out of a scraped page with lxml.
+
+Selectors are compiled once with `etree.XPath` and evaluated straight on the
+lxml tree, so a page costs one parse plus the nodes actually read instead of
+building and walking a BeautifulSoup tree.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from lxml import etree
+from lxml import html as lxml_html
+
+__all__ = [
+    "XPath",
+    "has_class",
+    "class_is",
+    "parse",
+    "first",
+    "text",
+    "Text",
+    "NotFound",
+    "Table",
+    "Spec",
+    "Extractor",
+]
+
+XPath = etree.XPath
+
+# BeautifulSoup leaves the contents of these tags out of get_text
+_TEXT = XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template"
+    " or ancestor::rt or ancestor::rp)]"
+)
+
+
+def has_class(name: str) -> str:
+    """XPath predicate matching elements with a class, like `{"class": name}` in bs4.
+
+    Args:
+        name (str): one class name
+
+    Returns:
+        str: predicate to put in square brackets
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def class_is(value: str) -> str:
+    """XPath predicate matching elements with exactly these classes in this order.
+
+    This is what bs4 does when the class it's given contains a space.
+
+    Args:
+        value (str): space separated class names
+
+    Returns:
+        str: predicate to put in square brackets
+    """
+    return f"normalize-space(@class) = '{value}'"
+
+
+def parse(html: str) -> etree._Element:
+    """Parse a page with the same libxml2 parser BeautifulSoup's lxml backend uses.
+
+    Args:
+        html (str): the page
+
+    Returns:
+        etree._Element: root of the document
+    """
+    return lxml_html.document_fromstring(html)
+
+
+def first(query: etree.XPath, node: etree._Element) -> Optional[etree._Element]:
+    """Get the first match of a compiled query, like bs4's `find`.
+
+    Args:
+        query (etree.XPath): compiled query
+        node (etree._Element): element to evaluate it on
+
+    Returns:
+        Optional[etree._Element]: first match or None
+    """
+    matches: List[etree._Element] = query(node)
+    return matches[0] if matches else None
+
+
+def text(node: etree._Element) -> str:
+    """Get the text of an element, like bs4's `get_text`.
+
+    Args:
+        node (etree._Element): the element
+
+    Returns:
+        str: text of the element and its descendants
+    """
+    return "".join(_TEXT(node))
+
+
+class Text(NamedTuple):
+    """A value read from the text of the first node matching `xpath`.
+
+    `xpath` may also select text nodes, eg. `text()`, which are joined.
+    With `strip` the text is put on one line and stripped before `type`
+    converts it.
+    """
+
+    xpath: str
+    type: Callable[[str], Any] = str
+    strip: bool = True
+
+
+class NotFound(NamedTuple):
+    """How a page says the player doesn't exist.
+
+    The page counts as not found when nothing matches `xpath`, or when
+    `equals` is given and the text of the first match equals it.
+    """
+
+    xpath: str
+    equals: Optional[str] = None
+
+
+class Table(NamedTuple):
+    """Repeated sections of a page, each with a name and a set of stats."""
+
+    rows: str
+    name: Text
+    stats: str
+    stat_name: Text
+    stat_value: Text
+
+
+class Spec(NamedTuple):
+    """What to read from a page: named fields and a table of stats."""
+
+    not_found: NotFound
+    table: Table
+    table_key: str = "game_stats"
+    fields: Dict[str, Text] = {}
+
+
+class Extractor:
+    """A `Spec` with every query compiled, ready to run on pages."""
+
+    def __init__(self, spec: Spec):
+        self.spec = spec
+        self.not_found = XPath(spec.not_found.xpath)
+        self.fields = {
+            name: self._compile(field) for name, field in spec.fields.items()
+        }
+        table = spec.table
+        self.rows = XPath(table.rows)
+        self.row_name = self._compile(table.name)
+        self.stats = XPath(table.stats)
+        self.stat_name = self._compile(table.stat_name)
+        self.stat_value = self._compile(table.stat_value)
+
+    @staticmethod
+    def _compile(field: Text) -> Tuple[etree.XPath, Text]:
+        return XPath(field.xpath), field
+
+    @staticmethod
+    def _read(compiled: Tuple[etree.XPath, Text], node: etree._Element) -> Any:
+        query, field = compiled
+        matches = query(node)
+        if not matches:
+            return None
+        if isinstance(matches[0], str):
+            value = "".join(matches)
+        else:
+            value = text(matches[0])
+        if field.strip:
+            value = value.replace("\n", "").strip()
+        return field.type(value)
+
+    def _missing(self, root: etree._Element) -> bool:
+        match = first(self.not_found, root)
+        if match is None:
+            return True
+        equals = self.spec.not_found.equals
+        return equals is not None and text(match) == equals
+
+    def __call__(self, html: str) -> Union[dict, bool]:
+        """Extract the data of a page.
+
+        Args:
+            html (str): the page
+
+        Returns:
+            Union[dict, bool]: the fields and table or False if the page is not found
+        """
+        root = parse(html)
+        if self._missing(root):
+            return False
+        data = {name: self._read(field, root) for name, field in self.fields.items()}
+        rows = []
+        for row in self.rows(root):
+            stats = {}
+            for stat in self.stats(row):
+                name = self._read(self.stat_name, stat)
+                if name is not None:
+                    stats[name] = self._read(self.stat_value, stat)
+            rows.append({self._read(self.row_name, row): stats})
+        data[self.spec.table_key] = rows
+        return data
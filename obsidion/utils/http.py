@@ -0,0 +1,71 @@
+import socket
+from typing import Optional
+
+import aiohttp
+from yarl import URL
+
+from obsidion import constants
+
+__all__ = ["create_connector", "create_session", "timeout_for"]
+
+
+def create_connector(
+    resolver: Optional[aiohttp.abc.AbstractResolver] = None,
+) -> aiohttp.TCPConnector:
+    """Create the connector used for requests to upstream apis.
+
+    Connections are limited per host so one slow upstream can only tie up its
+    own share of the pool, idle connections are kept open for reuse and
+    resolved addresses are cached for `constants.Http.dns_ttl` seconds.
+
+    Args:
+        resolver (Optional[aiohttp.abc.AbstractResolver], optional): dns resolver to use. Defaults to None.
+
+    Returns:
+        aiohttp.TCPConnector: the connector
+    """
+    return aiohttp.TCPConnector(
+        resolver=resolver,
+        # Use AF_INET to prevent HTTPS related problems both locally and in production.
+        family=socket.AF_INET,
+        limit=constants.Http.limit,
+        limit_per_host=constants.Http.limit_per_host,
+        keepalive_timeout=constants.Http.keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=constants.Http.dns_ttl,
+    )
+
+
+def create_session(connector: aiohttp.TCPConnector) -> aiohttp.ClientSession:
+    """Create the session used for requests to upstream apis.
+
+    Args:
+        connector (aiohttp.TCPConnector): connector made by `create_connector`
+
+    Returns:
+        aiohttp.ClientSession: the session, with the default timeouts applied
+    """
+    return aiohttp.ClientSession(
+        connector=connector, timeout=_timeout(constants.Http.timeouts["default"])
+    )
+
+
+def _timeout(config: dict) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(
+        sock_connect=config["connect"], sock_read=config["read"]
+    )
+
+
+def timeout_for(url: str) -> aiohttp.ClientTimeout:
+    """Get the timeouts configured for the host of a url.
+
+    Args:
+        url (str): url about to be requested
+
+    Returns:
+        aiohttp.ClientTimeout: connect and read timeouts for the host
+    """
+    timeouts = constants.Http.timeouts
+    # a host may only override one of the timeouts
+    config = {**timeouts["default"], **(timeouts.get(URL(url).host) or {})}
+    return _timeout(config)
@@ -0,0 +1,111 @@
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from yarl import URL
+
+from obsidion import constants
+from obsidion.utils import codec
+from obsidion.utils.http import timeout_for
+from obsidion.utils.utils import UpstreamError, upstream
+
+log = logging.getLogger(__name__)
+
+# parsed bodies kept in process so an unchanged resource isn't parsed again
+PARSED_ENTRIES = 128
+
+
+class HttpCache:
+    """Conditional request cache for documents that rarely change.
+
+    The body of each response is kept in redis together with its `ETag` and
+    `Last-Modified` validators, which are sent back as `If-None-Match` and
+    `If-Modified-Since` on the next request. When the server answers 304 the
+    stored body is used, so an unchanged resource costs a header exchange.
+    The parsed body is also kept in process, keyed by its validator, so it
+    isn't parsed again either. Callers must not modify what they get back.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.parsed: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self.revalidated = 0
+        self.downloaded = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[dict]) -> str:
+        return f"http_{URL(url).update_query(params or {})}"
+
+    async def get(
+        self,
+        url: str,
+        params: dict = None,
+        parse: Callable[[str], Any] = codec.loads,
+    ) -> Any:
+        """Get a document, revalidating a stored copy instead of downloading it again.
+
+        Args:
+            url (str): url of the document
+            params (dict, optional): query parameters. Defaults to None.
+            parse (Callable[[str], Any], optional): parser of the body. Defaults to json.
+
+        Raises:
+            UpstreamError: the request failed, timed out or the server returned a 5xx
+
+        Returns:
+            Any: parsed document or False if it was not found
+        """
+        key = self.make_key(url, params)
+        raw = await self.bot.redis_session.get(key)
+        stored = self.bot.cache.codec.decode(raw) if raw is not None else None
+
+        headers = {}
+        if stored is not None:
+            if stored["etag"]:
+                headers["If-None-Match"] = stored["etag"]
+            if stored["last_modified"]:
+                headers["If-Modified-Since"] = stored["last_modified"]
+
+        async with upstream(url):
+            async with self.bot.http_session.get(
+                url, params=params, headers=headers, timeout=timeout_for(url)
+            ) as resp:
+                if resp.status == 304 and stored is not None:
+                    self.revalidated += 1
+                    return self._parse(key, stored, parse)
+                if resp.status >= 500:
+                    raise UpstreamError(url, resp.status)
+                if resp.status != 200:
+                    return False
+                # charset aware like the feed's old `resp.text()`, and never
+                # failing on a document that lies about its encoding
+                body = await resp.text(errors="replace")
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+
+        self.downloaded += 1
+        stored = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        }
+        if etag or last_modified:
+            await self.bot.redis_session.set(
+                key,
+                self.bot.cache.codec.encode(stored),
+                expire=constants.Http.conditional_ttl,
+            )
+        return self._parse(key, stored, parse)
+
+    def _parse(self, key: str, stored: dict, parse: Callable[[str], Any]) -> Any:
+        validator = f"{stored['etag']}|{stored['last_modified']}"
+        entry = self.parsed.get(key)
+        if entry is not None and entry[0] == validator:
+            self.parsed.move_to_end(key)
+            return entry[1]
+        value = parse(stored["body"])
+        if stored["etag"] or stored["last_modified"]:
+            self.parsed[key] = (validator, value)
+            while len(self.parsed) > PARSED_ENTRIES:
+                self.parsed.popitem(last=False)
+        return value
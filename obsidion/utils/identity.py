@@ -0,0 +1,137 @@
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import asyncpg
+
+from obsidion import constants
+from obsidion.utils import codec
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minecraft_identity (
+    uuid CHAR(32) PRIMARY KEY,
+    username TEXT NOT NULL,
+    username_updated_at TIMESTAMPTZ NOT NULL,
+    name_history JSONB,
+    names_updated_at TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS minecraft_identity_username
+    ON minecraft_identity (lower(username));
+"""
+
+
+class IdentityStore:
+    """Persistent index of Minecraft usernames, UUIDs and name histories.
+
+    Rows older than `constants.Mojang.identity_max_age` seconds are treated as
+    missing so they get refreshed from Mojang the next time they're needed.
+    When the database isn't available every lookup misses and writes are
+    dropped, so callers can always fall back to Mojang.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @property
+    def available(self) -> bool:
+        return self.bot.db_ready.is_set()
+
+    @property
+    def max_age(self) -> timedelta:
+        return timedelta(seconds=constants.Mojang.identity_max_age)
+
+    async def create_schema(self) -> None:
+        """Create the identity table if it doesn't exist yet."""
+        async with self.bot.db_pool.acquire() as connection:
+            await connection.execute(SCHEMA)
+
+    async def uuid_for(self, username: str) -> Optional[str]:
+        """Get the UUID last seen using a username.
+
+        Args:
+            username (str): username of the player, any case
+
+        Returns:
+            Optional[str]: uuid of the player or None if unknown or outdated
+        """
+        if not self.available:
+            return None
+        try:
+            return await self.bot.db_pool.fetchval(
+                "SELECT uuid FROM minecraft_identity "
+                "WHERE lower(username) = lower($1) "
+                "AND username_updated_at > now() - $2::interval "
+                "ORDER BY username_updated_at DESC LIMIT 1",
+                username,
+                self.max_age,
+            )
+        except (asyncpg.PostgresError, OSError):
+            log.exception(f"Failed to look up the uuid of {username}")
+            return None
+
+    async def names_for(self, uuid: str) -> Optional[List[dict]]:
+        """Get the name history of a UUID.
+
+        Args:
+            uuid (str): uuid of the player
+
+        Returns:
+            Optional[List[dict]]: name history in the Mojang api format or None
+                if unknown or outdated
+        """
+        if not self.available:
+            return None
+        try:
+            names = await self.bot.db_pool.fetchval(
+                "SELECT name_history FROM minecraft_identity "
+                "WHERE uuid = $1 AND names_updated_at > now() - $2::interval",
+                uuid,
+                self.max_age,
+            )
+        except (asyncpg.PostgresError, OSError):
+            log.exception(f"Failed to look up the name history of {uuid}")
+            return None
+        return codec.loads(names) if names else None
+
+    async def store_uuids(self, uuids: Dict[str, str]) -> None:
+        """Record the current username of several players.
+
+        Args:
+            uuids (Dict[str, str]): uuid of each username
+        """
+        if not self.available or not uuids:
+            return
+        try:
+            await self.bot.db_pool.executemany(
+                "INSERT INTO minecraft_identity (uuid, username, username_updated_at) "
+                "VALUES ($1, $2, now()) ON CONFLICT (uuid) DO UPDATE "
+                "SET username = EXCLUDED.username, username_updated_at = now()",
+                [(uuid, username) for username, uuid in uuids.items()],
+            )
+        except (asyncpg.PostgresError, OSError):
+            log.exception("Failed to store resolved usernames")
+
+    async def store_names(self, uuid: str, names: List[dict]) -> None:
+        """Record the name history of a player.
+
+        Args:
+            uuid (str): uuid of the player
+            names (List[dict]): name history in the Mojang api format
+        """
+        if not self.available or not names:
+            return
+        try:
+            await self.bot.db_pool.execute(
+                "INSERT INTO minecraft_identity "
+                "(uuid, username, username_updated_at, name_history, names_updated_at) "
+                "VALUES ($1, $2, now(), $3::jsonb, now()) ON CONFLICT (uuid) DO UPDATE "
+                "SET username = EXCLUDED.username, username_updated_at = now(), "
+                "name_history = EXCLUDED.name_history, names_updated_at = now()",
+                uuid,
+                names[-1]["name"],
+                codec.dumps(names).decode("utf-8"),
+            )
+        except (asyncpg.PostgresError, OSError):
+            log.exception(f"Failed to store the name history of {uuid}")
@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional, Tuple
+
+__all__ = ["MemoryRedis"]
+
+# rough per key bookkeeping cost on top of the key and value
+KEY_OVERHEAD = 96
+
+NO_ENCODING = object()
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode a value the same way aioredis does."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value).encode("utf-8")
+    raise TypeError(f"Bad data type {type(value).__name__}")
+
+
+class MemoryRedis:
+    """In-process stand in for the parts of `aioredis.Redis` the bot uses.
+
+    Keys are kept in least recently used order so both lookups and eviction
+    are O(1). Expiry times are kept in a heap which is drained on writes, so
+    expired keys free their memory without waiting to be read again. Once
+    `max_memory` bytes are in use the least recently used keys are evicted.
+    """
+
+    def __init__(self, max_memory: int):
+        self.max_memory = max_memory
+        self.used_memory = 0
+        self.evicted = 0
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+        self._data.clear()
+        self._expiry.clear()
+        self.used_memory = 0
+
+    async def wait_closed(self) -> None:
+        pass
+
+    def _live(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._data.pop(key)
+        self.used_memory -= len(key) + len(value) + KEY_OVERHEAD
+
+    def _expire_keys(self) -> None:
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._data.get(key)
+            # the key may have been overwritten with a new expiry since
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+        # drop heap entries of overwritten keys once they dominate the heap
+        if len(self._expiry) > 2 * len(self._data) + 64:
+            self._expiry = [
+                (expires_at, key)
+                for expires_at, key in self._expiry
+                if key in self._data and self._data[key][1] == expires_at
+            ]
+            heapq.heapify(self._expiry)
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float]) -> None:
+        self._expire_keys()
+        if key in self._data:
+            self._remove(key)
+        size = len(key) + len(value) + KEY_OVERHEAD
+        if size > self.max_memory:
+            return
+        expires_at = None
+        if ttl:
+            expires_at = time.monotonic() + ttl
+            heapq.heappush(self._expiry, (expires_at, key))
+        self._data[key] = (value, expires_at)
+        self.used_memory += size
+        while self.used_memory > self.max_memory:
+            self._remove(next(iter(self._data)))
+            self.evicted += 1
+
+    async def get(self, key: str, *, encoding: Any = NO_ENCODING) -> Any:
+        entry = self._live(key)
+        if entry is None:
+            return None
+        self._data.move_to_end(key)
+        if encoding is NO_ENCODING or encoding is None:
+            return entry[0]
+        return entry[0].decode(encoding)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        expire: int = 0,
+        pexpire: int = 0,
+        exist: Optional[str] = None,
+    ) -> bool:
+        if exist is not None:
+            exists = self._live(key) is not None
+            if (exist == "SET_IF_EXIST") != exists:
+                return False
+        ttl = expire or (pexpire / 1000 if pexpire else None)
+        self._set(key, encode_value(value), ttl)
+        return True
+
+    async def exists(self, key: str, *keys: str) -> int:
+        return sum(self._live(k) is not None for k in (key, *keys))
+
+    async def delete(self, key: str, *keys: str) -> int:
+        deleted = 0
+        for k in (key, *keys):
+            if self._live(k) is not None:
+                self._remove(k)
+                deleted += 1
+        return deleted
+
+    async def ttl(self, key: str) -> int:
+        entry = self._live(key)
+        if entry is None:
+            return -2
+        if entry[1] is None:
+            return -1
+        return round(entry[1] - time.monotonic())
+
+    def pipeline(self) -> "Pipeline":
+        return Pipeline(self)
+
+    def multi_exec(self) -> "Pipeline":
+        # commands run on the event loop without yielding so every pipeline
+        # is already atomic
+        return Pipeline(self)
+
+
+class Pipeline:
+    """Buffers commands until `execute` like an aioredis pipeline."""
+
+    def __init__(self, redis: MemoryRedis):
+        self._redis = redis
+        self._commands: List[Tuple[asyncio.Future, Callable, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+
+        def buffer(*args, **kwargs) -> asyncio.Future:
+            future = asyncio.get_event_loop().create_future()
+            self._commands.append((future, command, args, kwargs))
+            return future
+
+        return buffer
+
+    async def execute(self, *, return_exceptions: bool = False) -> list:
+        results = []
+        for future, command, args, kwargs in self._commands:
+            try:
+                result = await command(*args, **kwargs)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                result = e
+            future.set_result(result)
+            results.append(result)
+        self._commands.clear()
+        return results
@@ -0,0 +1,288 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import aiohttp
+
+from obsidion import constants
+from obsidion.utils import codec
+from obsidion.utils.cache import refreshing
+from obsidion.utils.http import timeout_for
+from obsidion.utils.utils import UpstreamError
+
+log = logging.getLogger(__name__)
+
+API_URL = "https://api.mojang.com"
+PROFILES_URL = f"{API_URL}/profiles/minecraft"
+
+# the most names the bulk profiles endpoint accepts in one request
+BATCH_SIZE = 10
+
+# names outside of this can't be registered and make bulk requests fail
+USERNAME_RE = re.compile(r"[A-Za-z0-9_]{1,16}")
+
+# how long to back off on a 429 without a Retry-After header
+DEFAULT_RETRY_AFTER = 60
+
+# how many times a rate limited background request is retried
+RATE_LIMIT_RETRIES = 2
+
+
+class TokenBucket:
+    """Token bucket rate limiter with a reserve kept for interactive calls.
+
+    Background calls may only take a token while more than `reserve` are
+    left, so cache refreshes can't starve commands of the shared limit.
+    """
+
+    def __init__(self, capacity: int, period: float, reserve: int):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.reserve = reserve
+        self.tokens = float(capacity)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(
+        self, background: bool = False, timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until a token is available and take it.
+
+        Args:
+            background (bool, optional): keep the reserve for interactive calls. Defaults to False.
+            timeout (Optional[float], optional): most seconds to wait. Defaults to no limit.
+
+        Returns:
+            bool: False without waiting if no token would be free within the timeout
+        """
+        floor = self.reserve if background else 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                wait = self.paused_until - now
+            else:
+                self._refill()
+                if self.tokens - 1 >= floor:
+                    self.tokens -= 1
+                    return True
+                wait = (floor + 1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, eg. after being rate limited.
+
+        Args:
+            seconds (float): how long to pause for
+        """
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class MojangClient:
+    """Client for the Mojang api, shared by every command and shard.
+
+    Requests are limited by one token bucket sized to Mojang's limit. Calls
+    made while refreshing the cache in the background count as background
+    calls and leave a reserve for commands. A 429 pauses every request for
+    the Retry-After the api asked for.
+
+    Only background calls wait out a pause and retry. Interactive calls
+    give up with an `UpstreamError` when they are rate limited or would
+    wait longer than `constants.Mojang.max_wait` for a token, so a command
+    never hangs behind the limit.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.bucket = TokenBucket(
+            constants.Mojang.rate_limit,
+            constants.Mojang.rate_period,
+            constants.Mojang.background_reserve,
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        json: Any = None,
+        background: bool = None,
+        strict: bool = False,
+    ) -> Any:
+        """Make a rate limited request to the Mojang api.
+
+        Args:
+            method (str): http method
+            url (str): url of the endpoint
+            json (Any, optional): json body to send. Defaults to None.
+            background (bool, optional): whether this is a background call,
+                inferred from whether the cache is refreshing if not given.
+            strict (bool, optional): only take 200 and 204 as answers and
+                treat any other status as a failure. Defaults to False.
+
+        Raises:
+            UpstreamError: Mojang failed, rate limited the bot or refused a
+                strict request, or no token was free within max_wait
+
+        Returns:
+            Any: decoded json or None if there was nothing there
+        """
+        if background is None:
+            background = refreshing.get()
+        timeout = None if background else constants.Mojang.max_wait
+        for _ in range(RATE_LIMIT_RETRIES + 1):
+            if not await self.bucket.acquire(background, timeout):
+                raise UpstreamError(url, 429)
+            try:
+                async with self.bot.http_session.request(
+                    method, url, json=json, timeout=timeout_for(url)
+                ) as resp:
+                    if resp.status == 429:
+                        retry_after = resp.headers.get("Retry-After")
+                        self.bucket.pause(
+                            float(retry_after) if retry_after else DEFAULT_RETRY_AFTER
+                        )
+                        log.warning(f"Rate limited by Mojang on {url}")
+                        if background:
+                            continue
+                        raise UpstreamError(url, 429)
+                    if resp.status >= 500 or (strict and resp.status not in (200, 204)):
+                        raise UpstreamError(url, resp.status)
+                    if resp.status != 200:
+                        return None
+                    return codec.loads(await resp.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise UpstreamError(url) from e
+        raise UpstreamError(url, 429)
+
+    async def profiles(self, usernames: List[str]) -> Dict[str, str]:
+        """Get the UUIDs of up to ten usernames in one request.
+
+        Args:
+            usernames (List[str]): usernames of the players
+
+        Raises:
+            UpstreamError: Mojang failed or rejected the batch, in which case
+                none of the usernames can be said to be unused
+
+        Returns:
+            Dict[str, str]: uuid of each username that is taken, keyed by its
+                correctly cased name
+        """
+        data = (
+            await self.request("POST", PROFILES_URL, json=usernames, strict=True) or []
+        )
+        return {profile["name"]: profile["id"] for profile in data}
+
+    async def name_history(self, uuid: str) -> Optional[List[dict]]:
+        """Get the name history of a player, oldest first.
+
+        Args:
+            uuid (str): uuid of the player
+
+        Returns:
+            Optional[List[dict]]: name history or None if the uuid is unknown
+        """
+        return await self.request("GET", f"{API_URL}/user/profiles/{uuid}/names")
+
+    async def sales(self, metric_keys: List[str]) -> Optional[dict]:
+        """Get the sales statistics of Mojang's games.
+
+        Args:
+            metric_keys (List[str]): metrics to add up
+
+        Returns:
+            Optional[dict]: total and last 24 hour sales
+        """
+        return await self.request(
+            "POST", f"{API_URL}/orders/statistics", json={"metricKeys": metric_keys}
+        )
+
+
+class UsernameResolver:
+    """Resolves usernames to UUIDs through the bulk Mojang profiles endpoint.
+
+    Lookups requested within `constants.Mojang.batch_window` of each other
+    are sent together, up to ten names per request, and the results fanned
+    back out to every waiter. Resolved names are kept in the `username`
+    cache namespace and the identity index, which is consulted before asking
+    Mojang.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def resolve(self, username: str) -> Union[str, bool]:
+        """Get the UUID of a username.
+
+        Args:
+            username (str): username of the player
+
+        Raises:
+            UpstreamError: Mojang could not be reached
+
+        Returns:
+            Union[str, bool]: uuid of the player or False if the name is not taken
+        """
+        return await self.bot.cache.get_or_fetch(
+            "username", username.lower(), lambda: self._load(username), expire=28800
+        )
+
+    async def _load(self, username: str) -> Union[str, bool]:
+        uuid = await self.bot.identities.uuid_for(username)
+        if uuid:
+            return uuid
+        return await self._enqueue(username.lower())
+
+    def _enqueue(self, name: str) -> asyncio.Future:
+        if not USERNAME_RE.fullmatch(name):
+            future = asyncio.get_event_loop().create_future()
+            future.set_result(False)
+            return future
+        future = self._pending.get(name)
+        if future is None:
+            future = asyncio.get_event_loop().create_future()
+            self._pending[name] = future
+            if len(self._pending) >= BATCH_SIZE:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_event_loop().call_later(
+                    constants.Mojang.batch_window, self._flush
+                )
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            asyncio.ensure_future(self._lookup(batch))
+
+    async def _lookup(self, batch: Dict[str, asyncio.Future]) -> None:
+        try:
+            uuids = await self.bot.mojang.profiles(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        log.debug(f"Resolved {len(uuids)} of {len(batch)} usernames in one request")
+        found = {name.lower(): uuid for name, uuid in uuids.items()}
+        for name, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(name, False))
+        await self.bot.identities.store_uuids(uuids)
@@ -0,0 +1,65 @@
+import asyncio
+from typing import List
+
+import discord
+from discord.ext import commands
+
+PREVIOUS = "\N{BLACK LEFT-POINTING TRIANGLE}"
+NEXT = "\N{BLACK RIGHT-POINTING TRIANGLE}"
+
+
+async def paginate(
+    ctx: commands.Context, pages: List[discord.Embed], timeout: float = 60.0
+) -> discord.Message:
+    """Send several embeds as one message the author can page through.
+
+    Args:
+        ctx (commands.Context): context of the command
+        pages (List[discord.Embed]): embeds to show, in order
+        timeout (float, optional): seconds of inactivity before paging stops. Defaults to 60.0.
+
+    Returns:
+        discord.Message: the message that was sent
+    """
+    if len(pages) == 1:
+        return await ctx.send(embed=pages[0])
+    for number, page in enumerate(pages, 1):
+        page.set_footer(text=f"Page {number}/{len(pages)}")
+    message = await ctx.send(embed=pages[0])
+    try:
+        for emoji in (PREVIOUS, NEXT):
+            await message.add_reaction(emoji)
+    except discord.HTTPException:
+        # no add reactions or read message history permission, so the pages
+        # can't be turned and are sent one after another instead
+        for page in pages[1:]:
+            await ctx.send(embed=page)
+        return message
+
+    def check(reaction: discord.Reaction, user: discord.User) -> bool:
+        return (
+            reaction.message.id == message.id
+            and user == ctx.author
+            and str(reaction.emoji) in (PREVIOUS, NEXT)
+        )
+
+    index = 0
+    while True:
+        try:
+            reaction, user = await ctx.bot.wait_for(
+                "reaction_add", timeout=timeout, check=check
+            )
+        except asyncio.TimeoutError:
+            break
+        index = (index + (1 if str(reaction.emoji) == NEXT else -1)) % len(pages)
+        await message.edit(embed=pages[index])
+        try:
+            await message.remove_reaction(reaction, user)
+        except discord.HTTPException:
+            # no manage messages permission or in a DM
+            pass
+    try:
+        await message.clear_reactions()
+    except discord.HTTPException:
+        pass
+    return message
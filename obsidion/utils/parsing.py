@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from obsidion import constants
+
+__all__ = ["ParsingPool", "parsing_pool"]
+
+log = logging.getLogger(__name__)
+
+
+def _warm_worker() -> None:
+    # pay for the parser imports when the worker starts, not on the first page
+    import lxml.html  # noqa: F401
+
+
+def _noop() -> None:
+    pass
+
+
+class ParsingPool:
+    """Process pool that parses scraped pages off the event loop.
+
+    Parsing a large page into a tree takes long enough to hold up heartbeats
+    and every other command, so pages are parsed in worker processes and
+    only the extracted dict comes back. At most `constants.Parsing.max_queue`
+    pages are queued or being parsed at once and each page gets
+    `constants.Parsing.timeout` seconds before the caller gives up on it.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # forked along with the first pool and swapped in if that one breaks
+        self._spare: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def _create() -> ProcessPoolExecutor:
+        # forked explicitly: workers inherit the compiled queries instead
+        # of importing the bot, which isn't safe to import under spawn
+        executor = ProcessPoolExecutor(
+            max_workers=constants.Parsing.workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_warm_worker,
+        )
+        # with fork every worker is started on the first submit
+        executor.submit(_noop)
+        return executor
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._create()
+        return self._executor
+
+    def warm(self) -> None:
+        """Fork the workers and a spare pool now, so the first pages don't wait for them."""
+        self.executor
+        if self._spare is None:
+            self._spare = self._create()
+
+    async def run(self, parser: Callable[..., Any], *args: Any) -> Any:
+        """Run a parser in a worker process.
+
+        Args:
+            parser (Callable[..., Any]): module level function to run, must be picklable
+            *args (Any): arguments of the parser, usually the page
+
+        Raises:
+            asyncio.TimeoutError: the queue was full or parsing took too long
+            BrokenProcessPool: a worker died, the next page gets a new pool
+
+        Returns:
+            Any: what the parser returned
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(constants.Parsing.max_queue)
+        timeout = constants.Parsing.timeout
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        await asyncio.wait_for(self._slots.acquire(), timeout)
+        executor = self.executor
+        try:
+            future = loop.run_in_executor(executor, parser, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._reset(executor)
+            raise
+        # the slot is only freed once the worker is done with the page, even
+        # if the caller has stopped waiting for it
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future), max(0.0, deadline - loop.time())
+            )
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def _release(self, future: asyncio.Future) -> None:
+        self._slots.release()
+        if not future.cancelled():
+            # mark the error as retrieved if the caller timed out
+            future.exception()
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        # every page in flight on the broken pool fails, only replace it once
+        if broken is not self._executor:
+            return
+        log.warning("A parsing worker died, switching to a new pool")
+        broken.shutdown(wait=False)
+        # fork only copies the calling thread, so a pool forked once the bot
+        # runs other threads (the sqlite store's executor, aiohttp's resolver)
+        # can have workers stuck on a lock one of them held. The spare was
+        # forked at startup like the first pool. Only when it breaks too is a
+        # pool forked this late, and stuck workers then show up as timeouts.
+        self._executor, self._spare = self._spare, None
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        for executor in (self._executor, self._spare):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._executor = self._spare = None
+
+
+parsing_pool = ParsingPool()
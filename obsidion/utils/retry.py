@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from obsidion import constants
+from obsidion.utils.utils import CircuitOpenError, UpstreamError
+
+__all__ = ["RetryBudget", "LatencyWindow", "RequestPolicy", "policy_for"]
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# latencies kept per endpoint to estimate the p95 from
+LATENCY_WINDOW = 200
+
+# requests needed before the p95 is trusted enough to hedge on
+MIN_SAMPLES = 20
+
+
+class RetryBudget:
+    """Limits retries and hedges to a fraction of the requests made.
+
+    Every request deposits `ratio` tokens and every retry or hedge withdraws
+    one, so during an outage the extra load is bounded instead of multiplying
+    every request by the number of attempts.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take a token for a retry or hedge.
+
+        Returns:
+            bool: False if the budget is spent
+        """
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful requests to an endpoint."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=size)
+
+    def record(self, elapsed: float) -> None:
+        self.samples.append(elapsed)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Get a percentile of the recorded latencies.
+
+        Args:
+            percent (float): percentile to get, eg. 95
+
+        Returns:
+            Optional[float]: latency in seconds or None with too few samples
+        """
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class RequestPolicy:
+    """Retries and hedging for idempotent requests to one endpoint.
+
+    A request that fails upstream is retried up to `retries` times after a
+    full jitter backoff. With `hedge` set, a second copy of a request is sent
+    once the first has taken longer than the endpoint's p95 latency and
+    whichever answers first wins. Both spend from a shared `RetryBudget`.
+    Requests refused by an open circuit breaker are never retried.
+
+    Every attempt, backoff and hedge fits in one `deadline`, so a request
+    never takes longer than that in total. A retry that can't be expected
+    to finish before the deadline isn't made.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        retries: int,
+        base_delay: float,
+        max_delay: float,
+        hedge: bool,
+        budget: float,
+        deadline: float,
+    ):
+        self.name = name
+        self.deadline = deadline
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.budget = RetryBudget(budget)
+        self.latency = LatencyWindow()
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Make a request under the policy.
+
+        Args:
+            request (Callable[[], Awaitable[T]]): makes one attempt at the request
+
+        Raises:
+            UpstreamError: every attempt failed, the budget ran out or the
+                deadline passed
+
+        Returns:
+            T: result of the first attempt to succeed
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+        while True:
+            self.budget.deposit()
+            try:
+                return await asyncio.wait_for(
+                    self._attempt(request), deadline - loop.time()
+                )
+            except asyncio.TimeoutError:
+                raise UpstreamError(self.name) from None
+            except CircuitOpenError:
+                raise
+            except UpstreamError:
+                if attempt >= self.retries:
+                    raise
+                delay = random.uniform(
+                    0, min(self.max_delay, self.base_delay * 2**attempt)
+                )
+                # a typical attempt has to fit after the backoff
+                expected = self.latency.percentile(50) or 0
+                if loop.time() + delay + expected >= deadline:
+                    raise
+                if not self.budget.withdraw():
+                    raise
+            attempt += 1
+            self.retried += 1
+            log.debug(f"Retrying {self.name} in {delay:.2f}s, attempt {attempt}")
+            await asyncio.sleep(delay)
+
+    async def _timed(self, request: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        result = await request()
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    async def _attempt(self, request: Callable[[], Awaitable[T]]) -> T:
+        hedge_after = self.latency.percentile(95) if self.hedge else None
+        if hedge_after is None:
+            return await self._timed(request)
+
+        first = asyncio.ensure_future(self._timed(request))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_after)
+            if not done and self.budget.withdraw():
+                self.hedged += 1
+                pending.add(asyncio.ensure_future(self._timed(request)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+_policies: Dict[str, RequestPolicy] = {}
+
+
+def policy_for(name: str) -> RequestPolicy:
+    """Get the request policy configured for an endpoint.
+
+    Args:
+        name (str): name of the endpoint in the `retry` config section
+
+    Returns:
+        RequestPolicy: the policy, shared by every caller
+    """
+    policy = _policies.get(name)
+    if policy is None:
+        policy = _policies[name] = RequestPolicy(name, **constants.Retry[name])
+    return policy
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from obsidion.utils.memory_redis import NO_ENCODING, Pipeline, encode_value
+
+__all__ = ["SqliteRedis"]
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at);
+"""
+
+
+class SqliteRedis:
+    """On-disk stand in for the parts of `aioredis.Redis` the bot uses.
+
+    Entries live in a sqlite database so the cache survives restarts. Expiry
+    times are stored as wall clock timestamps so TTLs keep counting down
+    while the bot is offline. Nothing is loaded up front, every command reads
+    only the row it needs. Expired rows are purged and the file compacted by
+    a background task.
+
+    All database access happens on a single worker thread so the event loop
+    never blocks on disk.
+    """
+
+    def __init__(self, path: str, compact_interval: int):
+        self.path = path
+        self.compact_interval = compact_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite-redis"
+        )
+        self._db: Optional[sqlite3.Connection] = None
+        self._compactor: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Future] = None
+
+    @classmethod
+    async def create(cls, path: str, compact_interval: int = 600) -> "SqliteRedis":
+        """Open or create the database and start background compaction.
+
+        Args:
+            path (str): path of the database file
+            compact_interval (int, optional): seconds between compactions. Defaults to 600.
+
+        Returns:
+            SqliteRedis: the opened store
+        """
+        self = cls(path, compact_interval)
+        await self._run(self._open)
+        self._compactor = asyncio.ensure_future(self._compact_loop())
+        return self
+
+    async def _run(self, fn, *args) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(self._executor, fn, *args)
+
+    def _open(self) -> None:
+        self._db = sqlite3.connect(self.path, isolation_level=None)
+        # auto_vacuum only takes effect if set before any table is created
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(SCHEMA)
+
+    @property
+    def closed(self) -> bool:
+        return self._closing is not None
+
+    def close(self) -> None:
+        if self._closing is not None:
+            return
+        if self._compactor is not None:
+            self._compactor.cancel()
+        self._closing = asyncio.ensure_future(self._close())
+
+    async def _close(self) -> None:
+        if self._db is not None:
+            await self._run(self._db.close)
+        self._executor.shutdown(wait=False)
+
+    async def wait_closed(self) -> None:
+        if self._closing is not None:
+            await self._closing
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                purged = await self._run(self._compact)
+            except sqlite3.Error:
+                log.exception(f"Failed to compact the sqlite cache at {self.path}")
+            else:
+                log.debug(f"Purged {purged} expired keys from {self.path}")
+
+    def _compact(self) -> int:
+        purged = self._db.execute(
+            "DELETE FROM cache WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        self._db.execute("PRAGMA incremental_vacuum")
+        self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return purged
+
+    def _get(self, key: str) -> Optional[tuple]:
+        return self._db.execute(
+            "SELECT value, expires_at FROM cache "
+            "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time()),
+        ).fetchone()
+
+    def _set(
+        self, key: str, value: bytes, ttl: Optional[float], exist: Optional[str]
+    ) -> bool:
+        if exist is not None:
+            exists = self._get(key) is not None
+            if (exist == "SET_IF_EXIST") != exists:
+                return False
+        expires_at = time.time() + ttl if ttl else None
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, expires_at),
+        )
+        return True
+
+    def _delete(self, keys: tuple) -> int:
+        now = time.time()
+        deleted = 0
+        for key in keys:
+            deleted += self._db.execute(
+                "DELETE FROM cache "
+                "WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now),
+            ).rowcount
+        return deleted
+
+    async def get(self, key: str, *, encoding: Any = NO_ENCODING) -> Any:
+        row = await self._run(self._get, key)
+        if row is None:
+            return None
+        if encoding is NO_ENCODING or encoding is None:
+            return row[0]
+        return row[0].decode(encoding)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        *,
+        expire: int = 0,
+        pexpire: int = 0,
+        exist: Optional[str] = None,
+    ) -> bool:
+        ttl = expire or (pexpire / 1000 if pexpire else None)
+        return await self._run(self._set, key, encode_value(value), ttl, exist)
+
+    async def exists(self, key: str, *keys: str) -> int:
+        count = 0
+        for k in (key, *keys):
+            count += await self._run(self._get, k) is not None
+        return count
+
+    async def delete(self, key: str, *keys: str) -> int:
+        return await self._run(self._delete, (key, *keys))
+
+    async def ttl(self, key: str) -> int:
+        row = await self._run(self._get, key)
+        if row is None:
+            return -2
+        if row[1] is None:
+            return -1
+        return round(row[1] - time.time())
+
+    def pipeline(self) -> Pipeline:
+        return Pipeline(self)
+
+    def multi_exec(self) -> Pipeline:
+        return Pipeline(self)
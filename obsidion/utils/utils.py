@@ -1,64 +1,82 @@
-async def get(session, url: str, params: dict = None, json: dict = None) -> dict:
-    """Get the json from a webpage.
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-    Args:
-        session ([type]): aiohttp session to use
-        url (str): url of restapi
-        params (dict, optional): paramters to pass to request Defaults to None.
-        json (dict, optional): json to pass to request. Defaults to None.
-
-    Returns:
-        dict: [description]
-    """
-    async with session.get(url, params=params, json=json) as resp:
-        if resp.status == 200:
-            data = await resp.json()
-            return data
-        return False
+import aiohttp
 
+from obsidion.utils import codec
+from obsidion.utils.breaker import breakers
+from obsidion.utils.http import timeout_for
 
-async def usernameToUUID(username: str, session) -> str:
-    """Takes in an mc username and tries to convert it to a mc uuid.
 
-    Args:
-        username (str): username of player which uuid will be from
-        session ([type]): aiohttp session
+class UpstreamError(Exception):
+    """Raised when an upstream service fails rather than reporting something as missing."""
 
-    Returns:
-        str: uuid of player
-    """
+    def __init__(self, url: str, status: int = None):
+        self.url = url
+        self.status = status
+        super().__init__(f"{url} failed with status {status}")
 
-    response = await session.post(
-        "https://api.mojang.com/profiles/minecraft", json=[username]
-    )
 
-    data = await response.json()
+class CircuitOpenError(UpstreamError):
+    """Raised instead of making a request to a host that has been failing."""
 
-    if response.status == 204 or data == []:
-        return False
+    def __init__(self, url: str, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(url)
 
-    return data[0]["id"]
 
-
-async def UUIDToUsername(uuid: str, session) -> str:
-    """Takes in a minecraft UUID and converts it to a minecraft username.
+@asynccontextmanager
+async def upstream(url: str) -> AsyncIterator[None]:
+    """Guard a request to an upstream service with the circuit breaker of its host.
 
     Args:
-        uuid (str): uuid of player
-        session ([type]): aiohttp session to use
+        url (str): url being requested
 
-    Returns:
-        str: username of player from uuid
+    Raises:
+        CircuitOpenError: the host has been failing, so no request was made
+        UpstreamError: the request failed, timed out or the server returned a 5xx
     """
+    breaker = breakers.get(url)
+    if not breaker.allow():
+        raise CircuitOpenError(url, breaker.retry_in)
+    try:
+        yield
+    except UpstreamError:
+        breaker.record_failure()
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        breaker.record_failure()
+        raise UpstreamError(url) from e
+    except BaseException:
+        # eg. cancelled, which says nothing about the health of the host
+        breaker.release()
+        raise
+    breaker.record_success()
 
-    data = await session.get(f"https://api.mojang.com/user/profiles/{uuid}/names")
 
-    if data.status == 204:
-        return False
+async def get(session, url: str, params: dict = None, json: dict = None) -> dict:
+    """Get the json from a webpage.
 
-    data = await data.json()
+    Args:
+        session ([type]): aiohttp session to use
+        url (str): url of restapi
+        params (dict, optional): paramters to pass to request Defaults to None.
+        json (dict, optional): json to pass to request. Defaults to None.
 
-    if not data:
-        return False
+    Raises:
+        UpstreamError: the request failed, timed out or the server returned a 5xx
 
-    return data[len(data) - 1]["name"]
+    Returns:
+        dict: json data or False if the resource was not found
+    """
+    async with upstream(url):
+        async with session.get(
+            url, params=params, json=json, timeout=timeout_for(url)
+        ) as resp:
+            if resp.status == 200:
+                data = codec.loads(await resp.read())
+                return data
+            if resp.status >= 500:
+                raise UpstreamError(url, resp.status)
+            return False